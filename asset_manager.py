@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# Lazily built game assets.
+# Each asset is registered with a factory and only built the first time it
+# is asked for, or ahead of time on a small thread pool via preload() (for
+# example while the main menu is showing).
+
+class AssetManager:
+    def __init__(self):
+        self._factories = {}
+        self._assets = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def register(self, name, factory):
+        self._factories[name] = factory
+
+    # Return the asset, building it now or waiting for a background build
+    def get(self, name):
+        try:
+            return self._assets[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            future = self._futures.get(name)
+        asset = future.result() if future is not None else self._factories[name]()
+
+        with self._lock:
+            self._futures.pop(name, None)
+            return self._assets.setdefault(name, asset)
+
+    # True once get(name) would return without building or waiting
+    def ready(self, name):
+        if name in self._assets:
+            return True
+        with self._lock:
+            future = self._futures.get(name)
+        return future is not None and future.done()
+
+    # Start building assets (all registered ones by default) in the background
+    def preload(self, names=None, max_workers=2):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="assets")
+        for name in names or list(self._factories):
+            with self._lock:
+                if name in self._assets or name in self._futures:
+                    continue
+                self._futures[name] = self._executor.submit(self._factories[name])
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # Dictionary-style view of an asset that is itself a dict (the sound
+    # table), so `sounds["jump"]` keeps working without building anything
+    # at import time
+    def lazy_dict(self, name):
+        return LazyAssetDict(self, name)
+
+class LazyAssetDict:
+    def __init__(self, manager, name):
+        self._manager = manager
+        self._name = name
+
+    def __getitem__(self, key):
+        return self._manager.get(self._name)[key]
+
+    def __contains__(self, key):
+        return key in self._manager.get(self._name)
+
+    def keys(self):
+        return self._manager.get(self._name).keys()
+
+# Several small sprites packed side by side into one surface, so they share
+# a single pixel format and can be drawn together with Surface.blits()
+class SpriteAtlas:
+    def __init__(self, sprites, padding=1):
+        # sprites maps name -> (surface, (dx, dy)), where the offset is where
+        # the sprite sits relative to the entity position it is drawn at
+        width = sum(sprite.get_width() + padding for sprite, _ in sprites.values())
+        height = max(sprite.get_height() for sprite, _ in sprites.values())
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.regions = {}
+
+        x = 0
+        for name, (sprite, offset) in sprites.items():
+            # Copy pixels as they are; a normal alpha blit onto the empty
+            # atlas would darken translucent pixels
+            self.surface.blit(sprite, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.regions[name] = (pygame.Rect(x, 0, sprite.get_width(), sprite.get_height()), offset)
+            x += sprite.get_width() + padding
+
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+    # Arguments for surface.blit() (or one entry of surface.blits()) that
+    # draw sprite `name` at entity position (x, y)
+    def blit_args(self, name, x, y):
+        area, (dx, dy) = self.regions[name]
+        return (self.surface, (x + dx, y + dy), area)
+
+# Surfaces derived from another asset (tinted, faded, scaled...), built the
+# first time each key is asked for and reused after that
+class VariantCache:
+    def __init__(self, build):
+        self.build = build
+        self.variants = {}
+
+    def get(self, *key):
+        variant = self.variants.get(key)
+        if variant is None:
+            variant = self.build(*key)
+            self.variants[key] = variant
+        return variant
+
+    def clear(self):
+        self.variants.clear()
+
+# Fonts created once per (name, size), plus a bounded LRU cache of rendered
+# text so a string that has not changed is never rasterized twice.
+# pygame.font must be initialized before the first render.
+class TextRenderer:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.rendered = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size, name=None):
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[(name, size)] = font
+        return font
+
+    def render(self, text, color, size, name=None, antialias=True):
+        key = (name, size, text, tuple(color), antialias)
+        surface = self.rendered.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.rendered.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size, name).render(text, antialias, color)
+        self.rendered[key] = surface
+        if len(self.rendered) > self.max_entries:
+            self.rendered.popitem(last=False)
+        return surface
@@ -0,0 +1,109 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import sound_synth
+
+# Compares the old per-sample synthesis loops against the vectorized
+# sound_synth helpers. Only noise-free sounds are compared sample by sample;
+# the rest are timed.
+#
+#   python benchmarks/bench_audio.py
+
+SAMPLE_RATE = 44100
+MAX_SAMPLE = 32767
+
+# Reference implementation of the old loop-based music synthesis (noise left
+# out so the outputs can be compared)
+def legacy_space_music(duration=30):
+    buffer = bytearray()
+    chord_progression = [
+        [196.00, 293.66, 392.00],
+        [174.61, 261.63, 349.23],
+        [233.08, 293.66, 349.23],
+        [196.00, 293.66, 392.00]
+    ]
+    chord_duration = duration / len(chord_progression)
+    for chord in chord_progression:
+        for i in range(int(chord_duration * SAMPLE_RATE)):
+            value = 0
+            for freq in chord:
+                fade = min(i, SAMPLE_RATE * chord_duration - i, SAMPLE_RATE * 0.5) / (SAMPLE_RATE * 0.5)
+                value += int(MAX_SAMPLE * 0.2 * fade * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))
+                value += int(MAX_SAMPLE * 0.05 * fade * math.sin(2 * math.pi * (freq * 1.01) * i / SAMPLE_RATE))
+            bass_freq = chord[0] / 2
+            value += int(MAX_SAMPLE * 0.15 * math.sin(2 * math.pi * bass_freq * i / SAMPLE_RATE))
+            value = max(min(value, MAX_SAMPLE), -MAX_SAMPLE)
+            buffer.extend([value & 0xFF, (value >> 8) & 0xFF])
+    return bytes(buffer)
+
+def vectorized_space_music(duration=30):
+    chord_progression = [
+        [196.00, 293.66, 392.00],
+        [174.61, 261.63, 349.23],
+        [233.08, 293.66, 349.23],
+        [196.00, 293.66, 392.00]
+    ]
+    chord_duration = duration / len(chord_progression)
+    t = sound_synth.timeline(chord_duration, SAMPLE_RATE)
+    fade = sound_synth.fade_envelope(len(t), SAMPLE_RATE * 0.5, SAMPLE_RATE * 0.5)
+    parts = []
+    for chord in chord_progression:
+        wave = fade * sound_synth.chord(chord, t, SAMPLE_RATE, 0.2)
+        wave += fade * sound_synth.chord([freq * 1.01 for freq in chord], t, SAMPLE_RATE, 0.05)
+        wave += 0.15 * sound_synth.sine(chord[0] / 2, t, SAMPLE_RATE)
+        parts.append(wave)
+    return sound_synth.to_int16(np.concatenate(parts)).tobytes()
+
+def legacy_effect(frequency, duration, volume=0.5, waveform="sine"):
+    buffer = bytearray()
+    for i in range(int(duration * SAMPLE_RATE)):
+        if waveform == "square":
+            value = int(MAX_SAMPLE * volume * (1 if math.sin(2 * math.pi * frequency * i / SAMPLE_RATE) > 0 else -1))
+        elif waveform == "sawtooth":
+            value = int(MAX_SAMPLE * volume * ((i % int(SAMPLE_RATE / frequency)) / (SAMPLE_RATE / frequency) * 2 - 1))
+        else:
+            value = int(MAX_SAMPLE * volume * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE))
+        buffer.extend([value & 0xFF, (value >> 8) & 0xFF])
+    return bytes(buffer)
+
+def vectorized_effect(frequency, duration, volume=0.5, waveform="sine"):
+    t = sound_synth.timeline(duration, SAMPLE_RATE)
+    if waveform == "square":
+        wave = sound_synth.square(frequency, t, SAMPLE_RATE)
+    elif waveform == "sawtooth":
+        wave = sound_synth.sawtooth(frequency, t, SAMPLE_RATE)
+    else:
+        wave = sound_synth.sine(frequency, t, SAMPLE_RATE)
+    return sound_synth.to_int16(volume * wave).tobytes()
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+# Largest per-sample difference between two int16 buffers
+def max_difference(a, b):
+    return int(np.max(np.abs(np.frombuffer(a, "<i2").astype(np.int32) - np.frombuffer(b, "<i2"))))
+
+def main():
+    cases = [
+        ("jump (sine 0.3s)", legacy_effect, vectorized_effect, (440, 0.3, 0.5, "sine")),
+        ("boost (sawtooth 0.5s)", legacy_effect, vectorized_effect, (660, 0.5, 0.5, "sawtooth")),
+        ("powerup (square 0.2s)", legacy_effect, vectorized_effect, (880, 0.2, 0.5, "square")),
+        ("background music (30s)", legacy_space_music, vectorized_space_music, (30,)),
+    ]
+    print(f"{'buffer':<26}{'loop':>10}{'numpy':>10}{'speedup':>10}{'max diff':>10}")
+    for name, legacy, vectorized, args in cases:
+        old, old_time = timed(legacy, *args)
+        new, new_time = timed(vectorized, *args)
+        print(f"{name:<26}{old_time * 1000:>8.1f}ms{new_time * 1000:>8.1f}ms"
+              f"{old_time / new_time:>9.0f}x{max_difference(old, new):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import random
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from entity_store import EntityStore
+
+# Entity store micro-benchmarks.
+#
+#   python benchmarks/bench_entities.py
+
+# Collision candidates for one rover, the two ways Game.collisions finds
+# them: test every entity, or only the ones from an x range query
+def hits_all(store, rover):
+    active = store.active
+    return [row for row in rover.collidelistall(store.rects()) if active[row]]
+
+def hits_in_range(store, rover):
+    rows = store.in_x_range(rover.x - 1, rover.right + 1)
+    if not len(rows):
+        return []
+    return [int(rows[i]) for i in rover.collidelistall(store.rects(rows))]
+
+def bench_collisions():
+    print("Collision candidates for one rover: every entity vs x range query")
+    print(f"{'entities':>10}{'all':>12}{'range':>12}")
+    for count in (4, 16, 32, 64, 128, 256, 1024, 4096):
+        random.seed(1)
+        store = EntityStore(["meteor"])
+        # Spread out the way spawns are, a screen or so apart per handful
+        span = max(800, count * 40)
+        store.extend([random.uniform(0, span) for _ in range(count)],
+                     [random.uniform(100, 500) for _ in range(count)], 20, 20, "meteor")
+        rover = pygame.Rect(span // 2, 300, 50, 30)
+        assert hits_all(store, rover) == hits_in_range(store, rover)
+
+        number = 20000
+        every = timeit.timeit(lambda: hits_all(store, rover), number=number) / number
+        # rects() of every entity is cached until the store changes, which
+        # in the game happens every few steps; time the uncached call
+        store._rects = None
+        uncached = timeit.timeit(lambda: (setattr(store, "_rects", None), hits_all(store, rover)),
+                                 number=number) / number
+        ranged = timeit.timeit(lambda: hits_in_range(store, rover), number=number) / number
+        print(f"{count:>10}{every * 1e6:>10.1f}us{ranged * 1e6:>10.1f}us"
+              f"   (all, rects rebuilt: {uncached * 1e6:.1f}us)")
+
+# Whole simulation steps at the entity counts a normal run has
+def bench_steps(steps=20000):
+    import lunar_rover_game_fixed as game_module
+    from scripted_input import ScriptedInput
+
+    pygame.display.init()
+    game_module.assets.register("sounds", game_module.silent_sound_effects)
+    random.seed(3)
+    game = game_module.Game(1, 3)
+    game.input = ScriptedInput(game_module.HEADLESS_SCRIPT)
+
+    elapsed = 0.0
+    collisions = 0.0
+    entities = 0
+    collide = game.collisions
+    def timed_collisions(store):
+        nonlocal collisions
+        start = timeit.default_timer()
+        result = collide(store)
+        collisions += timeit.default_timer() - start
+        return result
+    game.collisions = timed_collisions
+
+    for _ in range(steps):
+        # Keep the run going so every step counts
+        game.players[0].fuel = 100
+        game.players[0].health = 100
+        start = timeit.default_timer()
+        game.update()
+        elapsed += timeit.default_timer() - start
+        entities += len(game.hazards) + len(game.powerups)
+
+    print(f"Game.update over {steps} steps ({entities / steps:.0f} hazards and powerups on average)")
+    print(f"  {elapsed / steps * 1e6:.1f}us/step, of which collisions {collisions / steps * 1e6:.1f}us")
+    pygame.display.quit()
+
+def main():
+    bench_collisions()
+    print()
+    bench_steps()
+
+if __name__ == "__main__":
+    main()
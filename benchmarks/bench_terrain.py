@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from terrain import GRAY, TerrainGenerator
+
+# Terrain micro-benchmarks.
+#
+#   python benchmarks/bench_terrain.py
+
+# Reference implementation of the old linear scan in get_height_at
+def scan_height_at(terrain, x):
+    for i in range(len(terrain.heights) - 1):
+        x1 = terrain.scroll_x + i * terrain.segment_width
+        x2 = x1 + terrain.segment_width
+        if x1 <= x < x2:
+            y1 = terrain.heights[i]
+            y2 = terrain.heights[i + 1]
+            ratio = (x - x1) / (x2 - x1)
+            return y1 + ratio * (y2 - y1)
+    return terrain.ground_height
+
+def bench_height_lookup():
+    print("get_height_at: linear scan vs direct index")
+    print(f"{'segments':>10}{'scan':>14}{'direct':>14}{'speedup':>10}")
+    for screen_width in (800, 4000, 20000, 100000):
+        random.seed(1)
+        terrain = TerrainGenerator(screen_width, 600)
+        for _ in range(7):
+            terrain.update(5)
+        span = len(terrain.heights) * terrain.segment_width
+        xs = [random.uniform(-50, span + 50) for _ in range(200)]
+
+        # Both must agree before timing means anything
+        for x in xs:
+            assert abs(scan_height_at(terrain, x) - terrain.get_height_at(x)) < 1e-9
+
+        number = max(1, 20000 // len(terrain.heights))
+        scan = timeit.timeit(lambda: [scan_height_at(terrain, x) for x in xs], number=number)
+        direct = timeit.timeit(lambda: [terrain.get_height_at(x) for x in xs], number=number)
+        calls = number * len(xs)
+        print(f"{len(terrain.heights):>10}{scan / calls * 1e6:>12.2f}us{direct / calls * 1e6:>12.2f}us"
+              f"{scan / direct:>9.0f}x")
+
+# Reference implementation of the old draw: one polygon per segment
+def draw_segments(terrain, surface):
+    segments = terrain.segments
+    for i in range(len(segments) - 1):
+        x1, y1 = segments[i]
+        x2, y2 = segments[i + 1]
+        pygame.draw.polygon(surface, GRAY, [
+            (x1, y1),
+            (x2, y2),
+            (x2, terrain.screen_height),
+            (x1, terrain.screen_height)
+        ])
+
+def bench_draw(frames=600):
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600))
+
+    # Only the draw calls are timed; the terrain scrolls between frames.
+    # Each run gets a fresh terrain from the same seed, so both draw the
+    # same course
+    def run(draw):
+        random.seed(1)
+        terrain = TerrainGenerator(800, 600)
+        elapsed = 0.0
+        for _ in range(frames):
+            terrain.update(5)
+            screen.fill((0, 0, 0))
+            start = timeit.default_timer()
+            draw(terrain, screen)
+            elapsed += timeit.default_timer() - start
+        return elapsed / frames, terrain
+
+    polygons, _ = run(draw_segments)
+    chunks, terrain = run(TerrainGenerator.draw)
+
+    # Fraction of pixels that differ between the two renderings
+    screen.fill((0, 0, 0))
+    draw_segments(terrain, screen)
+    expected = pygame.surfarray.array3d(screen)
+    screen.fill((0, 0, 0))
+    terrain.draw(screen)
+    different = (pygame.surfarray.array3d(screen) != expected).any(axis=2).mean()
+
+    print("TerrainGenerator.draw: per-segment polygons vs cached chunks (dummy video driver)")
+    print(f"  polygons {polygons * 1e6:8.1f}us/frame")
+    print(f"  chunks   {chunks * 1e6:8.1f}us/frame  ({polygons / chunks:.0f}x faster, "
+          f"{len(terrain.chunks)} chunks cached, {different:.2%} of pixels differ)")
+    pygame.display.quit()
+
+def main():
+    bench_height_lookup()
+    print()
+    bench_draw()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import pygame
+
+# Combine rects that overlap enough that their bounding box is no bigger
+# than the two of them apart (e.g. a sprite and where it was last frame),
+# dropping empty ones
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        if not rect.width or not rect.height:
+            continue
+        for i, other in enumerate(merged):
+            union = other.union(rect)
+            if union.width * union.height <= other.width * other.height + rect.width * rect.height:
+                merged[i] = union
+                break
+        else:
+            merged.append(rect)
+    return merged
+
+# Pushes finished frames to the window.
+# With dirty rectangles enabled, only the parts of the screen that were
+# drawn this frame or the previous one (whatever moved away from there has
+# to be uploaded too) are passed to pygame.display.update(). A frame falls
+# back to a full update when the caller says the whole screen changed (by
+# passing None), or when the dirty area is so large that one big upload is
+# cheaper than many small ones.
+class DirtyRectDisplay:
+    def __init__(self, screen_rect, enabled=True, full_ratio=0.6):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.enabled = enabled
+        self.full_ratio = full_ratio  # Fraction of the screen above which a full update is used
+        self.previous = None  # Rects drawn last frame, or None after a full update
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.pixels = 0  # Total pixels uploaded
+
+    def update(self, rects=None):
+        if not self.enabled or rects is None or self.previous is None:
+            self.full_update()
+            self.previous = None if rects is None else list(rects)
+            return
+
+        dirty = merge_rects(self.screen_rect.clip(rect) for rect in list(rects) + self.previous)
+        area = sum(rect.width * rect.height for rect in dirty)
+        self.previous = list(rects)
+
+        if area > self.full_ratio * self.screen_rect.width * self.screen_rect.height:
+            self.full_update()
+        elif dirty:
+            pygame.display.update(dirty)
+            self.partial_updates += 1
+            self.pixels += area
+
+    def full_update(self):
+        pygame.display.update()
+        self.full_updates += 1
+        self.pixels += self.screen_rect.width * self.screen_rect.height
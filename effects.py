@@ -0,0 +1,73 @@
+import heapq
+
+# Timed effects (boost, shield...) on one target, such as a rover.
+# Running effects sit in a min-heap keyed by the tick they run out at, so
+# they cost nothing per step until one is due. Starting an effect that is
+# already running leaves a stale heap entry behind, which is skipped when
+# it comes up.
+
+# How an effect lasts, and what happens to its target when it starts and
+# ends. Callbacks are called with the target.
+class Effect:
+    def __init__(self, duration, stacking="refresh", on_start=None, on_end=None):
+        self.duration = duration  # Ticks
+        # What starting it again while it runs does: "refresh" restarts the
+        # duration, "extend" adds another duration, "keep" does nothing
+        self.stacking = stacking
+        self.on_start = on_start  # Only when it was not already running
+        self.on_end = on_end  # When it runs out or is ended early
+
+class EffectTimers:
+    def __init__(self, target, effects):
+        self.target = target
+        self.effects = effects  # Name -> Effect
+        self.tick = 0  # Steps run
+        self.ends = {}  # Running effects: name -> tick it runs out at
+        self.started = {}  # Running effects: name -> tick last (re)started
+        self.queue = []  # (tick, name), including stale entries
+
+    def start(self, name):
+        effect = self.effects[name]
+        end = self.ends.get(name)
+        if end is None:
+            end = self.tick + effect.duration
+            self.started[name] = self.tick
+            if effect.on_start:
+                effect.on_start(self.target)
+        elif effect.stacking == "refresh":
+            end = self.tick + effect.duration
+            self.started[name] = self.tick
+        elif effect.stacking == "extend":
+            end += effect.duration
+        else:
+            return
+        self.ends[name] = end
+        heapq.heappush(self.queue, (end, name))
+
+    # Stop an effect before it runs out
+    def end(self, name):
+        if self.ends.pop(name, None) is None:
+            return
+        del self.started[name]
+        effect = self.effects[name]
+        if effect.on_end:
+            effect.on_end(self.target)
+
+    def active(self, name):
+        return name in self.ends
+
+    # Ticks since the effect was (re)started
+    def elapsed(self, name):
+        return self.tick - self.started[name]
+
+    def remaining(self, name):
+        return self.ends[name] - self.tick
+
+    # Move on one tick and end the effects that ran out
+    def advance(self):
+        self.tick += 1
+        queue = self.queue
+        while queue and queue[0][0] <= self.tick:
+            end, name = heapq.heappop(queue)
+            if self.ends.get(name) == end:
+                self.end(name)
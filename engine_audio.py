@@ -0,0 +1,65 @@
+import pygame
+
+import sound_synth
+
+# Looping engine sound for one rover.
+# The engine tier is worked out from the rover's speed every frame, but the
+# mixer is only touched when the tier actually changes. Each rover slot owns
+# one reserved channel, reused for the lifetime of the process.
+
+ENGINE_TIERS = ("idle", "low", "medium", "high")
+
+def engine_tier(speed, boosting):
+    if boosting:
+        return "high"
+    elif speed > 7:
+        return "medium"
+    elif speed > 3:
+        return "low"
+    return "idle"
+
+class EngineAudio:
+    def __init__(self, sounds, slot=0, fade_ms=150):
+        self.sounds = sounds  # Needs "engine_<tier>" entries
+        self.slot = slot
+        self.fade_ms = fade_ms
+        self.tier = None
+        self.channel = None
+        self.playing = None
+        self.enabled = True
+        self.switches = 0  # Number of times the mixer was actually touched
+
+    def update(self, speed, boosting):
+        tier = engine_tier(speed, boosting)
+        if tier == self.tier or not self.enabled:
+            return
+        self.tier = tier
+
+        sound = self.sounds["engine_" + tier]
+        # Tiers that share one buffer keep looping without a restart
+        if sound is self.playing:
+            return
+
+        try:
+            if self.channel is None:
+                self.channel = sound_synth.reserve_channel(f"engine-{self.slot}")
+            # One channel can only hold one sound, so the new tier replaces
+            # the old one and fades in rather than starting with a click
+            self.channel.play(sound, loops=-1, fade_ms=self.fade_ms)
+        except (pygame.error, TypeError):
+            # No mixer (or placeholder sounds): stay silent from now on
+            self.enabled = False
+            return
+        self.playing = sound
+        self.switches += 1
+
+    def stop(self):
+        if self.channel is not None:
+            # SDL_mixer ignores fadeout() on a channel that has only just
+            # started fading in (still at volume 0), so stop that outright
+            if self.channel.get_volume() == 0:
+                self.channel.stop()
+            else:
+                self.channel.fadeout(self.fade_ms)
+        self.tier = None
+        self.playing = None
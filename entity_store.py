@@ -0,0 +1,245 @@
+import math
+
+import numpy as np
+
+# Array-backed store for many small entities (hazards, power-ups).
+# Every attribute lives in its own NumPy column, so querying, culling and
+# drawing many entities is a handful of array operations instead of a
+# Python loop. Rows 0 .. count - 1 are in use and kept in insertion order.
+#
+# Positions are in world coordinates, so entities that sit still in the
+# world are never touched as the camera moves.
+#
+# Reading a column attribute (store.x, store.active, ...) gives a view of
+# the rows in use, which can be updated in place but must not be assigned
+# to. The kind and sprite columns hold indices into store.kinds and
+# store.sprites.
+#
+# For range queries the store also keeps the rows sorted by x: adding rows
+# merges them into the order and compacting filters them out. Anything that
+# moves or resizes entities through the columns must call resort()
+# afterwards (EntityView attributes take care of it themselves).
+
+COLUMNS = (
+    ("x", np.float64),
+    ("y", np.float64),
+    ("width", np.float64),
+    ("height", np.float64),
+    ("kind", np.int16),
+    ("sprite", np.int16),
+    ("active", np.bool_),
+)
+
+class EntityStore:
+    def __init__(self, kinds, sprites=None, flags=(), view=None, capacity=64):
+        self.kinds = list(kinds)
+        self.sprites = list(sprites if sprites is not None else kinds)
+        self.kind_codes = {kind: code for code, kind in enumerate(self.kinds)}
+        self.sprite_codes = {sprite: code for code, sprite in enumerate(self.sprites)}
+        self.view = view or EntityView
+        self.count = 0
+        self.max_width = 0.0  # Widest entity ever added
+        self._order = np.zeros(0, np.intp)  # Rows sorted by x
+        self._keys = np.zeros(0)  # x of those rows, ascending
+        self._rects = None  # rects() of all rows, until they next change
+        # Extra boolean columns, e.g. "floating" for coins
+        self._columns = {name: np.zeros(capacity, dtype) for name, dtype in COLUMNS}
+        for flag in flags:
+            self._columns[flag] = np.zeros(capacity, np.bool_)
+
+    # Extra flag columns (the standard ones are properties, defined below)
+    def __getattr__(self, name):
+        try:
+            columns = self.__dict__["_columns"]
+        except KeyError:
+            raise AttributeError(name)
+        if name not in columns:
+            raise AttributeError(name)
+        return columns[name][:self.count]
+
+    def __len__(self):
+        return self.count
+
+    # Views stay valid until the next compaction (cull() or compact())
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("entity index out of range")
+        return self.view(self, index)
+
+    def __iter__(self):
+        return (self.view(self, index) for index in range(self.count))
+
+    def _reserve(self, extra):
+        capacity = len(self._columns["x"])
+        if self.count + extra <= capacity:
+            return
+        while capacity < self.count + extra:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self.count] = column[:self.count]
+            self._columns[name] = grown
+
+    # Add one entity and return its index
+    def add(self, x, y, width, height, kind, sprite=None, **flags):
+        return self.extend([x], [y], width, height, kind, sprite, **flags)
+
+    # Add many entities of one kind at once; every argument may be a scalar
+    # or one value per entity. Returns the index of the first one.
+    def extend(self, xs, ys, width, height, kind, sprite=None, **flags):
+        xs = np.asarray(xs, dtype=np.float64)
+        new = len(xs)
+        self._reserve(new)
+        start, end = self.count, self.count + new
+        columns = self._columns
+        columns["x"][start:end] = xs
+        columns["y"][start:end] = ys
+        columns["width"][start:end] = width
+        columns["height"][start:end] = height
+        columns["kind"][start:end] = self.kind_codes[kind]
+        columns["sprite"][start:end] = self.sprite_codes[kind if sprite is None else sprite]
+        columns["active"][start:end] = True
+        for flag in columns.keys() - {name for name, _ in COLUMNS}:
+            columns[flag][start:end] = flags.get(flag, False)
+        self.count = end
+        self._rects = None
+        self.max_width = max(self.max_width, float(np.max(width)))
+
+        # Merge the new rows into the sorted order
+        by_x = np.argsort(xs, kind="stable")
+        positions = self._keys.searchsorted(xs[by_x], side="right")
+        self._keys = np.insert(self._keys, positions, xs[by_x])
+        self._order = np.insert(self._order, positions, start + by_x)
+        return start
+
+    # Rebuild the sorted order after changing x
+    def resort(self):
+        self._rects = None
+        self._order = np.argsort(self.x, kind="stable")
+        self._keys = self.x[self._order]
+
+    # Keep the sorted order and cached rects right after one entity's x, y,
+    # width or height was set to value
+    def _resized(self, name, value):
+        if name == "x":
+            self.resort()
+        else:
+            if name == "width":
+                self.max_width = max(self.max_width, float(value))
+            self._rects = None
+
+    # Keep only the rows where `keep` is true, preserving their order
+    def compact(self, keep):
+        keep = np.asarray(keep, dtype=np.bool_)
+        rows = np.flatnonzero(keep)
+        if len(rows) == self.count:
+            return
+        for column in self._columns.values():
+            column[:len(rows)] = column[rows]
+        self.count = len(rows)
+        self._rects = None
+
+        # Drop the removed rows from the sorted order and renumber the rest
+        new_rows = np.cumsum(keep) - 1
+        kept = keep[self._order]
+        self._order = new_rows[self._order[kept]]
+        self._keys = self._keys[kept]
+
+    # Forget entities that are used up (inactive) or lie entirely left of
+    # x = left. Nothing else looks at them, so rows are only compacted once
+    # at least `slack` of the store is known to be gone; most calls only
+    # look at the one sorted x that decides it.
+    def cull(self, left, slack=0.5):
+        needed = max(1, math.ceil(slack * self.count))  # Rows gone to be worth it
+        if needed > self.count or not self._keys[needed - 1] < left - self.max_width:
+            return
+        self.compact(self.active & (self.x + self.width >= left))
+
+    def clear(self):
+        self.count = 0
+        self._rects = None
+        self._order = self._order[:0]
+        self._keys = self._keys[:0]
+
+    # Indices (ascending) of the active entities that overlap the x range
+    # [left, right). Binary searches the sorted order, so the cost depends
+    # on how many entities are near the range, not on how many there are.
+    def in_x_range(self, left, right):
+        first = self._keys.searchsorted(left - self.max_width)
+        last = self._keys.searchsorted(right)
+        if first == last:
+            return self._order[:0]
+        rows = np.sort(self._order[first:last])
+        x = self._columns["x"][rows]
+        near = self._columns["active"][rows] & (x < right) & (x + self._columns["width"][rows] > left)
+        return rows[near]
+
+    # (x, y, width, height) tuples for the given rows (all rows in use by
+    # default, inactive ones included), e.g. for Rect.collidelistall()
+    def rects(self, rows=None):
+        if rows is None:
+            if self._rects is None:
+                self._rects = self.rects(slice(0, self.count))
+            return self._rects
+        columns = self._columns
+        return list(zip(columns["x"][rows].tolist(), columns["y"][rows].tolist(),
+                        columns["width"][rows].tolist(), columns["height"][rows].tolist()))
+
+    # (sprite name, x - dx, y) for the active entities overlapping the x
+    # range [left, right), in the order they were added
+    def sprite_positions(self, left, right, dx=0.0):
+        rows = self.in_x_range(left, right)
+        columns = self._columns
+        names = self.sprites
+        return [(names[sprite], x, y)
+                for sprite, x, y in zip(columns["sprite"][rows].tolist(),
+                                        (columns["x"][rows] - dx).tolist(),
+                                        columns["y"][rows].tolist())]
+
+def _live_column(name):
+    return property(lambda self: self._columns[name][:self.count])
+
+for _name, _ in COLUMNS:
+    setattr(EntityStore, _name, _live_column(_name))
+
+# Attribute-style access to one row of an EntityStore, for code that
+# handles entities one at a time
+class EntityView:
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getattr__(self, name):
+        # Extra flag columns
+        try:
+            return self.store._columns[name][self.index].item()
+        except KeyError:
+            raise AttributeError(name)
+
+    def __eq__(self, other):
+        return isinstance(other, EntityView) and other.store is self.store and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    @property
+    def type(self):
+        return self.store.kinds[self.store._columns["kind"][self.index]]
+
+    @property
+    def sprite(self):
+        return self.store.sprites[self.store._columns["sprite"][self.index]]
+
+def _column_property(name):
+    def get(self):
+        return self.store._columns[name][self.index].item()
+    def set(self, value):
+        self.store._columns[name][self.index] = value
+        if name != "active":
+            self.store._resized(name, value)
+    return property(get, set)
+
+for _name in ("x", "y", "width", "height", "active"):
+    setattr(EntityView, _name, _column_property(_name))
@@ -0,0 +1,47 @@
+import json
+import os
+
+import numpy as np
+
+# Coin formations (lines, arcs, tunnels...) as precomputed offset tables.
+# Formations are read from a JSON data file, so new ones need no code:
+#
+#   {"<set>": {"<name>": {"coins": [[dx, dy], ...],
+#                         "hazards": [[dx, dy, "<hazard type>"], ...],
+#                         "lift": [min, max]}}}
+#
+# dx is how far right of the spawn point a coin or hazard goes, and dy how
+# far below the ground under it (negative is above). "hazards" and "lift"
+# (a random extra height for the whole formation) are optional. Each set
+# is a list of formations the game picks from, e.g. "path" for the coin
+# pathways.
+
+FORMATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "formations.json")
+
+class Formation:
+    def __init__(self, name, coins, hazards=(), lift=None):
+        self.name = name
+        self.lift = tuple(lift) if lift else None
+
+        # Every distinct x offset, so the ground under the whole formation
+        # is looked up in one call; coins and hazards refer to these
+        coins = np.asarray(coins, dtype=np.float64).reshape(-1, 2)
+        hazard_offsets = np.array([(dx, dy) for dx, dy, _ in hazards], dtype=np.float64).reshape(-1, 2)
+        self.dx, points = np.unique(np.concatenate([coins[:, 0], hazard_offsets[:, 0]]), return_inverse=True)
+
+        self.coin_points = points[:len(coins)]
+        self.coin_dy = coins[:, 1]
+
+        # Hazards grouped by type, as (points, dy), to add each type at once
+        self.hazards = {}
+        hazard_points = points[len(coins):]
+        for kind in dict.fromkeys(kind for _, _, kind in hazards):
+            rows = [i for i, (_, _, other) in enumerate(hazards) if other == kind]
+            self.hazards[kind] = (hazard_points[rows], hazard_offsets[rows, 1])
+
+# Read a formations file into {set name: [Formation, ...]}
+def load_formations(path=FORMATIONS_PATH):
+    with open(path) as file:
+        data = json.load(file)
+    return {group: [Formation(name, **spec) for name, spec in formations.items()]
+            for group, formations in data.items()}
@@ -0,0 +1,121 @@
+import os
+import struct
+from array import array
+
+import numpy as np
+
+# Time-trial ghosts: where a rover was at every simulation step, small
+# enough to record for hours and to keep between runs.
+# Positions are quantized to 1/quantum of a pixel and stored as the change
+# from the step before, one signed byte per axis. A change too big for a
+# byte is stored as ESCAPE, with the whole position in a separate list of
+# escapes (the first step always is one). An hour of ghost takes about
+# 420 KB.
+#
+# File layout, little-endian: HEADER, then the deltas (frames x 2 int8),
+# then the escapes (int32).
+
+GHOST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "ghost.dat")
+MAGIC = b"LRGH"
+VERSION = 1
+QUANTUM = 4  # Quantization units per pixel
+ESCAPE = -128
+HEADER = struct.Struct("<4sHHIIq")  # Magic, version, quantum, frames, escapes, course seed
+
+class GhostRecorder:
+    def __init__(self, quantum=QUANTUM):
+        self.quantum = quantum
+        self.deltas = array("b")
+        self.escapes = array("i")
+        self.last = [0, 0]  # Quantized position at the last step
+
+    def __len__(self):
+        return len(self.deltas) // 2
+
+    def record(self, x, y):
+        for axis, value in enumerate((x, y)):
+            position = round(value * self.quantum)
+            delta = position - self.last[axis]
+            if ESCAPE < delta <= 127:
+                self.deltas.append(delta)
+            else:
+                self.deltas.append(ESCAPE)
+                self.escapes.append(position)
+            self.last[axis] = position
+
+    # Write the ghost for the course with terrain seed `seed`
+    def save(self, path=GHOST_PATH, seed=0):
+        # Write to a temporary file first so a crash never leaves a
+        # half-written ghost behind
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.quantum, len(self), len(self.escapes), seed))
+            file.write(self.deltas.tobytes())
+            file.write(np.asarray(self.escapes, dtype="<i4").tobytes())
+        os.replace(temp_path, path)
+
+    # Play back what has been recorded so far, without going through a file
+    def player(self, seed=None):
+        return GhostPlayer(np.array(self.deltas, dtype=np.int8).reshape(-1, 2),
+                           np.array(self.escapes, dtype=np.int32), self.quantum, seed)
+
+# Steps through a recorded ghost one position at a time. The deltas and
+# escapes may be memory-mapped, so only the part being played is read.
+class GhostPlayer:
+    def __init__(self, deltas, escapes, quantum=QUANTUM, seed=None):
+        self.deltas = deltas
+        self.escapes = escapes
+        self.quantum = quantum
+        self.seed = seed  # Terrain seed of the course it was recorded on
+        self.rewind()
+
+    def __len__(self):
+        return len(self.deltas)
+
+    # Let go of the file being played, e.g. before saving over it (a
+    # memory-mapped file cannot be replaced on Windows)
+    def close(self):
+        self.deltas = np.zeros((0, 2), np.int8)
+        self.escapes = np.zeros(0, np.int32)
+        self.rewind()
+
+    def rewind(self):
+        self.frame = 0
+        self.escape = 0
+        self.last = [0, 0]
+
+    # Position at the next step, or None after the last one
+    def advance(self):
+        if self.frame == len(self.deltas):
+            return None
+        for axis, delta in enumerate(self.deltas[self.frame].tolist()):
+            if delta == ESCAPE:
+                self.last[axis] = int(self.escapes[self.escape])
+                self.escape += 1
+            else:
+                self.last[axis] += delta
+        self.frame += 1
+        return (self.last[0] / self.quantum, self.last[1] / self.quantum)
+
+# The ghost saved at `path`, memory-mapped, or None if there is no usable
+# one (missing, from another version, cut short or otherwise corrupt)
+def load_ghost(path=GHOST_PATH):
+    try:
+        with open(path, "rb") as file:
+            magic, version, quantum, frames, escapes, seed = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or not quantum or not frames:
+            return None
+        if os.path.getsize(path) != HEADER.size + frames * 2 + escapes * 4:
+            return None
+        deltas = np.memmap(path, dtype=np.int8, mode="r", offset=HEADER.size, shape=(frames, 2))
+        # Every escape marker needs its position, or playback would run off
+        # the end of the escapes mid-race
+        if np.count_nonzero(deltas == ESCAPE) != escapes:
+            return None
+        if escapes:
+            escape_values = np.memmap(path, dtype="<i4", mode="r", offset=HEADER.size + frames * 2, shape=(escapes,))
+        else:
+            escape_values = np.zeros(0, np.int32)
+    except (OSError, ValueError, struct.error):
+        return None
+    return GhostPlayer(deltas, escape_values, quantum, seed)
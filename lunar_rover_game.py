@@ -2,17 +2,21 @@ import pygame
 import random
 import math
 import os
+import numpy as np
 from pygame import mixer
 
-# Initialize pygame
-pygame.init()
-mixer.init()
+from asset_manager import AssetManager, SpriteAtlas, TextRenderer, VariantCache
+from engine_audio import EngineAudio
+from ghost import GhostRecorder, load_ghost
+import music_stream
+import sound_cache
+import sound_synth
+from terrain import TerrainGenerator
 
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Lunar Rover Race")
+screen = None  # Created by init_display() so importing this module opens no window
 
 # Colors
 WHITE = (255, 255, 255)
@@ -26,17 +30,29 @@ YELLOW = (255, 255, 0)
 # Game variables
 clock = pygame.time.Clock()
 FPS = 60
+MENU_IDLE_MS = 1000  # Longest the main menu sleeps waiting for input
 
 # Lunar physics
 MOON_GRAVITY = 0.16  # Moon's gravity is about 1/6 of Earth's
 
+# Initialize pygame and open the game window
+def init_display():
+    global screen
+    pygame.init()
+    mixer.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Lunar Rover Race")
+    create_asset_directories()
+    return screen
+
 # Create directories for assets if they don't exist
-if not os.path.exists("assets"):
-    os.makedirs("assets")
-if not os.path.exists("assets/sounds"):
-    os.makedirs("assets/sounds")
-if not os.path.exists("assets/images"):
-    os.makedirs("assets/images")
+def create_asset_directories():
+    if not os.path.exists("assets"):
+        os.makedirs("assets")
+    if not os.path.exists("assets/sounds"):
+        os.makedirs("assets/sounds")
+    if not os.path.exists("assets/images"):
+        os.makedirs("assets/images")
 
 # Create simple rover sprite
 def create_rover_sprite():
@@ -59,6 +75,34 @@ def create_rover_sprite():
     
     return rover
 
+# Colors added on top of the rover sprite for each skin
+SKIN_TINTS = {"red": (255, 0, 0, 100), "green": (0, 255, 0, 100)}
+
+# Build one rover sprite variant; cached by rover_variants so this only
+# runs once per (skin, alpha, scale)
+def create_rover_variant(skin="default", alpha=255, scale=1):
+    rover = assets.get("rover_img").copy()
+    
+    # Tint the rover for colored skins
+    tint = SKIN_TINTS.get(skin)
+    if tint is not None:
+        tint_surface = pygame.Surface(rover.get_size(), pygame.SRCALPHA)
+        tint_surface.fill(tint)
+        rover.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    
+    if scale != 1:
+        width, height = rover.get_size()
+        rover = pygame.transform.smoothscale(rover, (int(width * scale), int(height * scale)))
+    
+    if pygame.display.get_surface() is not None:
+        rover = rover.convert_alpha()
+    
+    # Semi-transparent variants (the time trial ghost)
+    if alpha != 255:
+        rover.set_alpha(alpha)
+    
+    return rover
+
 # Create stars for background
 def create_starry_background():
     background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -89,37 +133,91 @@ def create_starry_background():
     
     return background
 
+# Create hazard and powerup sprites once, packed into a single atlas so
+# every entity is drawn with one blit
+def create_entity_atlas():
+    sprites = {}
+    
+    # Meteor (red circle with some details)
+    meteor = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(meteor, RED, (10, 10), 10)
+    pygame.draw.circle(meteor, (150, 50, 50), (6, 6), 3)
+    sprites["meteor"] = (meteor, (0, 0))
+    
+    # Laser beam (red rectangle seen through a 2 pixel glow on every side)
+    laser = pygame.Surface((14, 44), pygame.SRCALPHA)
+    pygame.draw.rect(laser, (255, 100, 100, 128), (0, 0, 14, 44))
+    pygame.draw.rect(laser, (255, 50, 50), (2, 2, 10, 40))
+    sprites["laser"] = (laser, (-2, -2))
+    
+    # Crater (gray ellipse with shadow)
+    crater = pygame.Surface((50, 10), pygame.SRCALPHA)
+    pygame.draw.ellipse(crater, GRAY, (0, 0, 50, 10))
+    pygame.draw.ellipse(crater, (50, 50, 50), (5, 5, 40, 5))
+    sprites["crater"] = (crater, (0, 0))
+    
+    # Boost powerup (green arrow, whose tip reaches one pixel past the box)
+    boost = pygame.Surface((21, 21), pygame.SRCALPHA)
+    boost.fill(GREEN, (0, 0, 20, 20))
+    pygame.draw.polygon(boost, (50, 200, 50), [(10, 0), (20, 10), (15, 10), (15, 20), (5, 20), (5, 10), (0, 10)])
+    sprites["boost"] = (boost, (0, 0))
+    
+    # Shield powerup (blue circle with shield symbol)
+    shield = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(shield, BLUE, (10, 10), 10)
+    pygame.draw.arc(shield, (100, 100, 255), (2, 2, 16, 16), 0, math.pi, 2)
+    sprites["shield"] = (shield, (0, 0))
+    
+    # Magnet powerup (yellow horseshoe)
+    magnet = pygame.Surface((20, 20), pygame.SRCALPHA)
+    magnet.fill(YELLOW)
+    pygame.draw.arc(magnet, (200, 200, 0), (2, 2, 16, 16), 0, math.pi, 3)
+    sprites["magnet"] = (magnet, (0, 0))
+    
+    return SpriteAtlas(sprites)
+
 # Create built-in sound effects
 def create_sound_effect(frequency, duration, volume=0.5, waveform="sine"):
-    buffer = bytearray()
-    sample_rate = 44100
-    max_sample = 32767
-    
-    for i in range(int(duration * sample_rate)):
-        if waveform == "sine":
-            value = int(max_sample * volume * math.sin(2 * math.pi * frequency * i / sample_rate))
-        elif waveform == "square":
-            value = int(max_sample * volume * (1 if math.sin(2 * math.pi * frequency * i / sample_rate) > 0 else -1))
-        elif waveform == "sawtooth":
-            value = int(max_sample * volume * ((i % int(sample_rate / frequency)) / (sample_rate / frequency) * 2 - 1))
-        elif waveform == "noise":
-            value = int(max_sample * volume * random.uniform(-1, 1))
-        else:  # Default to sine
-            value = int(max_sample * volume * math.sin(2 * math.pi * frequency * i / sample_rate))
-            
-        # Convert to 16-bit little-endian format
-        buffer.extend([value & 0xFF, (value >> 8) & 0xFF])
-    
-    sound = pygame.mixer.Sound(buffer=buffer)
-    return sound
+    pcm = sound_cache.default_cache.load("effect", synth_sound_effect,
+                                         (frequency, duration, volume, waveform), 44100)
+    return sound_synth.make_sound(pcm)
+
+def synth_sound_effect(sample_rate, frequency, duration, volume, waveform):
+    t = sound_synth.timeline(duration, sample_rate)
+    
+    if waveform == "square":
+        wave = sound_synth.square(frequency, t, sample_rate)
+    elif waveform == "sawtooth":
+        wave = sound_synth.sawtooth(frequency, t, sample_rate)
+    elif waveform == "noise":
+        wave = sound_synth.noise(len(t))
+    else:  # Default to sine
+        wave = sound_synth.sine(frequency, t, sample_rate)
+    
+    return sound_synth.to_int16(volume * wave)
 
-# Create space-themed background music
-def create_space_music(duration=30):
-    # Create a buffer for a longer piece of music
-    buffer = bytearray()
-    sample_rate = 44100
-    max_sample = 32767
+# Render part of one chord of the space-themed background music; t holds
+# sample positions within a chord that is `length` samples long
+def render_space_chord(chord, t, length, sample_rate):
+    # Fade in/out for smoother transitions
+    fade = sound_synth.fade_envelope(length, sample_rate * 0.5, sample_rate * 0.5, t)
+    
+    # Mix the frequencies, each with some subtle modulation
+    wave = fade * sound_synth.chord(chord, t, sample_rate, 0.2)
+    wave += fade * sound_synth.chord([freq * 1.01 for freq in chord], t, sample_rate, 0.05)
+    
+    # Add a subtle bass line
+    wave += 0.15 * sound_synth.sine(chord[0] / 2, t, sample_rate)
     
+    # Add some ambient noise
+    wave += 0.02 * sound_synth.noise(len(t))
+    
+    # Clipping happens in the int16 conversion
+    return wave
+
+# Create space-themed background music, streamed in short chunks so it never
+# has to be synthesized up front and can vary endlessly
+def create_space_music(chord_duration=7.5):
     # Space-themed chord progression
     chord_progression = [
         [196.00, 293.66, 392.00],  # G minor
@@ -128,64 +226,30 @@ def create_space_music(duration=30):
         [196.00, 293.66, 392.00]   # G minor again
     ]
     
-    # Duration of each chord in seconds
-    chord_duration = duration / len(chord_progression)
-    
-    # Create the music
-    for chord in chord_progression:
-        for i in range(int(chord_duration * sample_rate)):
-            # Mix the frequencies with different amplitudes
-            value = 0
-            for j, freq in enumerate(chord):
-                # Fade in/out for smoother transitions
-                fade = min(i, sample_rate * chord_duration - i, sample_rate * 0.5) / (sample_rate * 0.5)
-                # Add harmonics with decreasing volume
-                value += int(max_sample * 0.2 * fade * math.sin(2 * math.pi * freq * i / sample_rate))
-                # Add some subtle modulation
-                value += int(max_sample * 0.05 * fade * math.sin(2 * math.pi * (freq * 1.01) * i / sample_rate))
-            
-            # Add a subtle bass line
-            bass_freq = chord[0] / 2
-            value += int(max_sample * 0.15 * math.sin(2 * math.pi * bass_freq * i / sample_rate))
-            
-            # Add some ambient noise
-            value += int(max_sample * 0.02 * random.uniform(-1, 1))
-            
-            # Clip to prevent overflow
-            value = max(min(value, max_sample), -max_sample)
-            
-            # Convert to 16-bit little-endian format
-            buffer.extend([value & 0xFF, (value >> 8) & 0xFF])
-    
-    sound = pygame.mixer.Sound(buffer=buffer)
-    return sound
+    chunks = music_stream.chord_chunks(music_stream.chord_sequence(chord_progression),
+                                       render_space_chord, chord_duration, 44100)
+    return music_stream.MusicStream(chunks)
 
 # Create engine sound that changes with speed
 def create_engine_sound(base_frequency=80, duration=1.0):
-    buffer = bytearray()
-    sample_rate = 44100
-    max_sample = 32767
+    pcm = sound_cache.default_cache.load("engine", synth_engine_sound, (base_frequency, duration), 44100)
+    return sound_synth.make_sound(pcm)
+
+def synth_engine_sound(sample_rate, base_frequency, duration):
+    t = sound_synth.timeline(duration, sample_rate)
     
-    # Create a loopable engine sound with some harmonics
-    for i in range(int(duration * sample_rate)):
-        # Base engine tone
-        value = int(max_sample * 0.3 * math.sin(2 * math.pi * base_frequency * i / sample_rate))
-        
-        # Add harmonics
-        value += int(max_sample * 0.15 * math.sin(2 * math.pi * (base_frequency * 2) * i / sample_rate))
-        value += int(max_sample * 0.1 * math.sin(2 * math.pi * (base_frequency * 3) * i / sample_rate))
-        
-        # Add some noise for texture
-        value += int(max_sample * 0.05 * random.uniform(-1, 1))
-        
-        # Add some pulsing/vibration
-        value = int(value * (0.9 + 0.1 * math.sin(2 * math.pi * 30 * i / sample_rate)))
-        
-        # Convert to 16-bit little-endian format
-        buffer.extend([value & 0xFF, (value >> 8) & 0xFF])
+    # Base engine tone plus harmonics
+    wave = 0.3 * sound_synth.sine(base_frequency, t, sample_rate)
+    wave += 0.15 * sound_synth.sine(base_frequency * 2, t, sample_rate)
+    wave += 0.1 * sound_synth.sine(base_frequency * 3, t, sample_rate)
+    
+    # Add some noise for texture
+    wave += 0.05 * sound_synth.noise(len(t))
     
-    sound = pygame.mixer.Sound(buffer=buffer)
-    return sound
+    # Add some pulsing/vibration
+    wave = sound_synth.tremolo(wave, t, 30, 0.1, sample_rate)
+    
+    return sound_synth.to_int16(wave)
 
 # Create sound effects
 def load_sound_effects():
@@ -203,103 +267,40 @@ def load_sound_effects():
     sounds["engine_medium"] = create_engine_sound(120, 1.0)
     sounds["engine_high"] = create_engine_sound(150, 1.0)
     
-    # Create space background music
-    sounds["background_music"] = create_space_music(30)
-    
     return sounds
 
-# Create assets
-rover_img = create_rover_sprite()
-background_img = create_starry_background()
-sounds = load_sound_effects()
+# Background music stream, started from the main menu
+music = None
 
-# Terrain generation
-class TerrainGenerator:
-    def __init__(self, screen_width, screen_height):
-        self.screen_width = screen_width
-        self.screen_height = screen_height
-        self.ground_height = screen_height * 0.7
-        self.segments = []
-        self.segment_width = 20
-        self.generate_initial_terrain()
-    
-    def generate_initial_terrain(self):
-        # Generate terrain segments that extend beyond the screen
-        for x in range(0, self.screen_width + 500, self.segment_width):
-            # Create some variation in height
-            height = self.ground_height + random.randint(-30, 30)
-            # Occasionally add craters or hills
-            if random.random() < 0.1:
-                # Crater
-                height += random.randint(20, 40)
-            elif random.random() < 0.1:
-                # Hill
-                height -= random.randint(20, 40)
-            
-            self.segments.append((x, height))
-    
-    def update(self, scroll_speed):
-        # Remove segments that have scrolled off screen
-        while self.segments and self.segments[0][0] < -self.segment_width:
-            self.segments.pop(0)
-        
-        # Add new segments at the right edge
-        last_x = self.segments[-1][0]
-        last_height = self.segments[-1][1]
-        
-        if last_x < self.screen_width + 500:
-            new_x = last_x + self.segment_width
-            # Smooth transition from last height
-            new_height = last_height + random.randint(-10, 10)
-            
-            # Occasionally add craters or hills
-            if random.random() < 0.1:
-                # Crater
-                new_height += random.randint(20, 40)
-            elif random.random() < 0.1:
-                # Hill
-                new_height -= random.randint(20, 40)
-            
-            # Keep height within reasonable bounds
-            new_height = max(min(new_height, self.ground_height + 50), self.ground_height - 50)
-            
-            self.segments.append((new_x, new_height))
-        
-        # Scroll all segments
-        for i in range(len(self.segments)):
-            self.segments[i] = (self.segments[i][0] - scroll_speed, self.segments[i][1])
-    
-    def draw(self, surface):
-        # Draw the terrain
-        for i in range(len(self.segments) - 1):
-            x1, y1 = self.segments[i]
-            x2, y2 = self.segments[i + 1]
-            
-            # Draw the segment
-            pygame.draw.polygon(surface, GRAY, [
-                (x1, y1), 
-                (x2, y2), 
-                (x2, self.screen_height), 
-                (x1, self.screen_height)
-            ])
-    
-    def get_height_at(self, x):
-        # Find the height of the terrain at position x
-        for i in range(len(self.segments) - 1):
-            x1, y1 = self.segments[i]
-            x2, y2 = self.segments[i + 1]
-            
-            if x1 <= x < x2:
-                # Linear interpolation
-                ratio = (x - x1) / (x2 - x1)
-                return y1 + ratio * (y2 - y1)
-        
-        # Default if not found
-        return self.ground_height
+def start_music():
+    global music
+    if music is None:
+        try:
+            music = create_space_music()
+            music.start()
+        except Exception as e:
+            print(f"Error starting music: {e}")
+            music = None
+
+def stop_music():
+    global music
+    if music is not None:
+        music.stop()
+        music = None
+
+# Assets are built on first use, or in the background by assets.preload()
+assets = AssetManager()
+assets.register("rover_img", create_rover_sprite)
+assets.register("background_img", create_starry_background)
+assets.register("entity_atlas", create_entity_atlas)
+assets.register("sounds", load_sound_effects)
+sounds = assets.lazy_dict("sounds")
+rover_variants = VariantCache(create_rover_variant)
+text_cache = TextRenderer()  # Fonts and rendered strings for the scores and menu
 
 # Player class
 class Rover:
-    def __init__(self, x, y):
+    def __init__(self, x, y, player_index=0):
         self.x = x
         self.y = y
         self.width = 50
@@ -314,8 +315,7 @@ class Rover:
         self.shield_time = 0
         self.skin = "default"  # default or red or green
         self.skins = {"default": "blue", "red": "red", "green": "green"}
-        self.engine_sound_playing = False
-        self.engine_sound_channel = None
+        self.engine_audio = EngineAudio(sounds, player_index)  # One mixer channel per player slot
     
     def update(self, terrain, keys):
         # Apply gravity
@@ -354,42 +354,12 @@ class Rover:
         self.update_engine_sound()
     
     def update_engine_sound(self):
-        # Determine which engine sound to play based on speed
-        if self.boosting:
-            engine_sound = sounds["engine_high"]
-        elif self.speed > 7:
-            engine_sound = sounds["engine_medium"]
-        elif self.speed > 3:
-            engine_sound = sounds["engine_low"]
-        else:
-            engine_sound = sounds["engine_idle"]
-        
-        # Play the appropriate engine sound if not already playing
-        if not self.engine_sound_playing:
-            self.engine_sound_channel = engine_sound.play(-1)  # Loop indefinitely
-            self.engine_sound_playing = True
-        else:
-            # Stop current sound and play new one if speed changed
-            if self.engine_sound_channel is not None:
-                self.engine_sound_channel.stop()
-            self.engine_sound_channel = engine_sound.play(-1)
+        # Switches the looping engine sound only when the speed tier changes
+        self.engine_audio.update(self.speed, self.boosting)
     
     def draw(self, surface):
         # Draw the rover with different colors based on skin
-        rover_copy = rover_img.copy()
-        
-        if self.skin == "red":
-            # Tint the rover red
-            red_tint = pygame.Surface(rover_copy.get_size(), pygame.SRCALPHA)
-            red_tint.fill((255, 0, 0, 100))
-            rover_copy.blit(red_tint, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-        elif self.skin == "green":
-            # Tint the rover green
-            green_tint = pygame.Surface(rover_copy.get_size(), pygame.SRCALPHA)
-            green_tint.fill((0, 255, 0, 100))
-            rover_copy.blit(green_tint, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-        
-        surface.blit(rover_copy, (self.x, self.y))
+        surface.blit(rover_variants.get(self.skin), (self.x, self.y))
         
         # Draw shield if active
         if self.shield_active:
@@ -437,27 +407,8 @@ class Hazard:
     def draw(self, surface):
         if not self.active:
             return
-            
-        if self.type == "meteor":
-            # Draw a meteor (red circle with some details)
-            pygame.draw.circle(surface, RED, (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(self.width / 2))
-            # Add some meteor details
-            pygame.draw.circle(surface, (150, 50, 50), 
-                              (int(self.x + self.width / 3), int(self.y + self.height / 3)), 
-                              int(self.width / 6))
-        elif self.type == "laser":
-            # Draw a laser beam (red rectangle with glow)
-            pygame.draw.rect(surface, RED, (self.x, self.y, self.width, self.height))
-            # Add glow effect
-            glow_surf = pygame.Surface((self.width + 4, self.height + 4), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surf, (255, 100, 100, 128), (0, 0, self.width + 4, self.height + 4))
-            surface.blit(glow_surf, (self.x - 2, self.y - 2))
-        elif self.type == "crater":
-            # Draw a crater (gray ellipse with shadow)
-            pygame.draw.ellipse(surface, GRAY, (self.x, self.y, self.width, self.height))
-            # Add shadow
-            pygame.draw.ellipse(surface, (50, 50, 50), (self.x + 5, self.y + 5, self.width - 10, self.height - 5))
+        
+        surface.blit(*assets.get("entity_atlas").blit_args(self.type, self.x, self.y))
     
     def check_collision(self, rover):
         if not self.active:
@@ -489,36 +440,8 @@ class PowerUp:
     def draw(self, surface):
         if not self.active:
             return
-            
-        if self.type == "boost":
-            # Draw a boost powerup (green arrow)
-            pygame.draw.rect(surface, GREEN, (self.x, self.y, self.width, self.height))
-            # Draw arrow shape
-            points = [
-                (self.x + self.width/2, self.y),
-                (self.x + self.width, self.y + self.height/2),
-                (self.x + 3*self.width/4, self.y + self.height/2),
-                (self.x + 3*self.width/4, self.y + self.height),
-                (self.x + self.width/4, self.y + self.height),
-                (self.x + self.width/4, self.y + self.height/2),
-                (self.x, self.y + self.height/2)
-            ]
-            pygame.draw.polygon(surface, (50, 200, 50), points)
-        elif self.type == "shield":
-            # Draw a shield powerup (blue circle)
-            pygame.draw.circle(surface, BLUE, (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(self.width / 2))
-            # Draw shield symbol
-            pygame.draw.arc(surface, (100, 100, 255), 
-                           (self.x + 2, self.y + 2, self.width - 4, self.height - 4),
-                           0, math.pi, 2)
-        elif self.type == "magnet":
-            # Draw a magnet powerup (yellow horseshoe)
-            pygame.draw.rect(surface, YELLOW, (self.x, self.y, self.width, self.height))
-            # Draw magnet symbol
-            pygame.draw.arc(surface, (200, 200, 0), 
-                           (self.x + 2, self.y + 2, self.width - 4, self.height - 4),
-                           0, math.pi, 3)
+        
+        surface.blit(*assets.get("entity_atlas").blit_args(self.type, self.x, self.y))
     
     def check_collision(self, rover):
         if not self.active:
@@ -532,12 +455,12 @@ class PowerUp:
 
 # Game state
 class Game:
-    def __init__(self, num_players=1):
+    def __init__(self, num_players=1, seed=None):
         self.num_players = num_players
-        self.terrain = TerrainGenerator(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.terrain = TerrainGenerator(SCREEN_WIDTH, SCREEN_HEIGHT, seed)
         self.players = [Rover(100, 300)]
         if num_players == 2:
-            self.players.append(Rover(150, 300))
+            self.players.append(Rover(150, 300, 1))
             self.players[1].skin = "red"  # Second player uses red rover
         
         self.scroll_speed = 5
@@ -549,17 +472,35 @@ class Game:
         self.powerup_timer = 0
         
         # Ghost data for time trials
+        # Ghosts are recorded in world coordinates (screen x plus
+        # terrain.world_x), so their files work in both builds
         self.recording_ghost = False
-        self.ghost_data = []
+        self.ghost_recorder = GhostRecorder()  # Player 1's path while recording
         self.playing_ghost = False
-        self.ghost_position = []
-        self.ghost_index = 0
+        self.ghost = None  # GhostPlayer being raced against
+        self.ghost_position = []  # World coordinates
+        self.ghost_offset = 0.0  # World x added to the ghost's path since it last started over
+    
+    # Keep the time-trial ghost recorded so far for next time, and return a
+    # GhostPlayer for it (played from the saved file when it could be saved)
+    def save_ghost(self):
+        if self.ghost is not None:
+            self.ghost.close()  # It may be the file saved over
+        try:
+            self.ghost_recorder.save(seed=self.terrain.seed)
+            ghost = load_ghost()
+        except OSError:
+            ghost = None
+        if ghost is None:
+            ghost = self.ghost_recorder.player(self.terrain.seed)
+        return ghost
     
     def update(self):
         if self.game_over:
             return
             
         # Update terrain
+        previous_world_x = self.terrain.world_x
         self.terrain.update(self.scroll_speed)
         
         # Update players
@@ -586,15 +527,19 @@ class Game:
             
             # Record ghost data if in time trial mode
             if self.recording_ghost and i == 0:
-                self.ghost_data.append((player.x, player.y))
+                self.ghost_recorder.record(player.x + self.terrain.world_x, player.y)
         
         # Update ghost if playing
-        if self.playing_ghost and self.ghost_data:
-            if self.ghost_index < len(self.ghost_data):
-                self.ghost_position = self.ghost_data[self.ghost_index]
-                self.ghost_index += 1
-            else:
-                self.ghost_index = 0
+        if self.playing_ghost and self.ghost is not None:
+            position = self.ghost.advance()
+            if position is None:
+                # Start over from where the terrain is now, as the path was
+                # recorded from the start of the course
+                self.ghost.rewind()
+                self.ghost_offset = previous_world_x
+                position = self.ghost.advance()
+            if position is not None:
+                self.ghost_position = (position[0] + self.ghost_offset, position[1])
         
         # Generate hazards
         self.hazard_timer += 1
@@ -603,7 +548,7 @@ class Game:
             if random.random() < 0.7:  # 70% chance to spawn a hazard
                 hazard_type = random.choice(["meteor", "laser", "crater"])
                 x = SCREEN_WIDTH + 50
-                y = random.randint(100, int(self.terrain.ground_height) - 50)
+                y = random.randint(100, int(self.terrain.get_height_at(x)) - 50)
                 self.hazards.append(Hazard(x, y, hazard_type))
         
         # Generate powerups
@@ -613,7 +558,7 @@ class Game:
             if random.random() < 0.5:  # 50% chance to spawn a powerup
                 power_type = random.choice(["boost", "shield", "magnet"])
                 x = SCREEN_WIDTH + 50
-                y = random.randint(100, int(self.terrain.ground_height) - 50)
+                y = random.randint(100, int(self.terrain.get_height_at(x)) - 50)
                 self.powerups.append(PowerUp(x, y, power_type))
         
         # Update hazards and check collisions
@@ -657,21 +602,27 @@ class Game:
         
         # Increase score
         self.score += 1
+        
+        if self.game_over:
+            self.stop_engines()
+    
+    # Silence the rovers' engine loops, whose mixer channels outlive the
+    # game (call when it ends or is replaced)
+    def stop_engines(self):
+        for player in self.players:
+            player.engine_audio.stop()
     
     def draw(self, surface):
         # Draw background
-        surface.blit(background_img, (0, 0))
+        surface.blit(assets.get("background_img"), (0, 0))
         
         # Draw terrain
         self.terrain.draw(surface)
         
-        # Draw hazards
-        for hazard in self.hazards:
-            hazard.draw(surface)
-        
-        # Draw powerups
-        for powerup in self.powerups:
-            powerup.draw(surface)
+        # Draw hazards, then powerups, from the sprite atlas in one batch
+        atlas = assets.get("entity_atlas")
+        surface.blits([atlas.blit_args(entity.type, entity.x, entity.y)
+                       for entity in self.hazards + self.powerups if entity.active], doreturn=False)
         
         # Draw players
         for player in self.players:
@@ -680,24 +631,22 @@ class Game:
         # Draw ghost if playing
         if self.playing_ghost and self.ghost_position:
             ghost_x, ghost_y = self.ghost_position
+            ghost_x -= self.terrain.world_x
             # Draw a semi-transparent version of the rover for the ghost
-            ghost_rover = rover_img.copy()
-            ghost_rover.set_alpha(128)  # Semi-transparent
-            surface.blit(ghost_rover, (ghost_x, ghost_y))
+            surface.blit(rover_variants.get("default", 128), (ghost_x, ghost_y))
         
         # Draw UI
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {self.score}", True, WHITE)
+        score_text = text_cache.render(f"Score: {self.score}", WHITE, 36)
         surface.blit(score_text, (10, 10))
         
         for i, player in enumerate(self.players):
-            health_text = font.render(f"P{i+1} Health: {player.health}", True, WHITE)
+            health_text = text_cache.render(f"P{i+1} Health: {player.health}", WHITE, 36)
             surface.blit(health_text, (10, 50 + i * 40))
         
         if self.game_over:
-            game_over_text = font.render("GAME OVER", True, RED)
+            game_over_text = text_cache.render("GAME OVER", RED, 36)
             surface.blit(game_over_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2))
-            restart_text = font.render("Press R to restart", True, WHITE)
+            restart_text = text_cache.render("Press R to restart", WHITE, 36)
             surface.blit(restart_text, (SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2 + 50))
 
 # Main menu
@@ -706,44 +655,70 @@ def main_menu():
     selected = 0
     options = ["Single Player", "Two Players", "Time Trial", "Quit"]
     
-    # Play background music
-    try:
-        sounds["background_music"].play(-1)  # Loop indefinitely
-    except:
-        pass
+    # Build the remaining assets in the background while the menu is showing
+    assets.preload()
+    
+    # Stream background music
+    start_music()
+    
+    # The menu is only redrawn when something changes: the whole menu on
+    # the first frame (or when the window needs repainting), after that
+    # just the options, when the selection moves. In between, the loop
+    # sleeps in pygame.event.wait() instead of spinning at the frame rate.
+    redraw = True
+    dirty = None
     
     while menu:
-        screen.fill(BLACK)
-        
-        # Draw background
-        screen.blit(background_img, (0, 0))
-        
-        # Draw title
-        font_title = pygame.font.Font(None, 72)
-        title_text = font_title.render("LUNAR ROVER RACE", True, WHITE)
-        screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 100))
-        
-        # Draw menu options
-        font_menu = pygame.font.Font(None, 48)
-        for i, option in enumerate(options):
-            color = YELLOW if i == selected else WHITE
-            text = font_menu.render(option, True, color)
-            screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 250 + i * 60))
-        
-        pygame.display.update()
-        
-        # Handle events
-        for event in pygame.event.get():
+        if redraw:
+            screen.fill(BLACK)
+            
+            # Draw background
+            screen.blit(assets.get("background_img"), (0, 0))
+            
+            # Draw title
+            title_text = text_cache.render("LUNAR ROVER RACE", WHITE, 72)
+            screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 100))
+            
+            # Draw menu options
+            option_rects = []
+            for i, option in enumerate(options):
+                color = YELLOW if i == selected else WHITE
+                text = text_cache.render(option, color, 48)
+                option_rects.append(screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 250 + i * 60)))
+            
+            if dirty is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(dirty)
+            redraw = False
+        
+        # Handle events, waiting for the next one (or the idle timeout)
+        event = pygame.event.wait(MENU_IDLE_MS)
+        events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+        exposed = False  # Whole window to repaint, whatever else happens
+        for event in events:
             if event.type == pygame.QUIT:
+                stop_music()
                 pygame.quit()
                 return None
             
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                redraw = True
+                exposed = True
+                dirty = None
+            
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
                     selected = (selected - 1) % len(options)
+                    redraw = True
+                    if not exposed:
+                        dirty = option_rects
                     sounds["jump"].play()
                 elif event.key == pygame.K_DOWN:
                     selected = (selected + 1) % len(options)
+                    redraw = True
+                    if not exposed:
+                        dirty = option_rects
                     sounds["jump"].play()
                 elif event.key == pygame.K_RETURN:
                     sounds["powerup"].play()
@@ -752,17 +727,25 @@ def main_menu():
                     elif selected == 1:  # Two Players
                         return Game(2)
                     elif selected == 2:  # Time Trial
-                        game = Game(1)
+                        # Race the ghost saved last time, on its course, if
+                        # there is one
+                        ghost = load_ghost()
+                        if ghost is not None:
+                            game = Game(1, seed=ghost.seed)
+                            game.playing_ghost = True
+                            game.ghost = ghost
+                        else:
+                            game = Game(1)
                         game.recording_ghost = True
                         return game
                     elif selected == 3:  # Quit
+                        stop_music()
                         pygame.quit()
                         return None
-        
-        clock.tick(FPS)
 
 # Main game loop
 def main():
+    init_display()
     running = True
     game = main_menu()
     
@@ -778,11 +761,14 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r and game.game_over:
                     # Restart game
+                    game.stop_engines()
                     if game.recording_ghost:
-                        # Start time trial with ghost
-                        new_game = Game(1)
+                        # Start time trial with ghost on the same course,
+                        # keeping the ghost for next time
+                        ghost = game.save_ghost()
+                        new_game = Game(1, seed=game.terrain.seed)
                         new_game.playing_ghost = True
-                        new_game.ghost_data = game.ghost_data
+                        new_game.ghost = ghost
                         game = new_game
                     else:
                         # Normal restart
@@ -800,6 +786,12 @@ def main():
         # Cap the frame rate
         clock.tick(FPS)
     
+    # Keep the time trial's ghost too, however it was left
+    if game.recording_ghost and len(game.ghost_recorder):
+        game.save_ghost()
+    
+    game.stop_engines()
+    stop_music()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -2,17 +2,31 @@ import pygame
 import random
 import math
 import os
+import time
+import argparse
+import numpy as np
 from pygame import mixer
 
-# Initialize pygame
-pygame.init()
-mixer.init()
+from asset_manager import AssetManager, SpriteAtlas, TextRenderer, VariantCache
+from dirty_rects import DirtyRectDisplay
+from effects import Effect, EffectTimers
+from engine_audio import EngineAudio
+from entity_store import EntityStore, EntityView
+from formations import load_formations
+from ghost import GhostRecorder, load_ghost
+from scripted_input import ScriptedInput
+from spawn_schedule import SpawnRule, SpawnScheduler, WeightedTable
+import music_stream
+import sound_cache
+import sound_synth
+from terrain import TerrainGenerator
+from timestep import FixedTimestep
 
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Lunar Rover Race")
+screen = None  # Created by init_display() so importing this module opens no window
+display = None  # Pushes frames to the window, see DirtyRectDisplay
 
 # Colors
 WHITE = (255, 255, 255)
@@ -25,18 +39,36 @@ YELLOW = (255, 255, 0)
 
 # Game variables
 clock = pygame.time.Clock()
-FPS = 60
+FPS = 60  # Simulation steps per second; speeds and timers are all per step
+RENDER_FPS = 60  # Frames drawn per second (0 for no limit), independent of game speed
+MAX_CATCH_UP_STEPS = 5  # Most simulation steps run for one drawn frame
+# Only upload the changed parts of each frame (helps when the display upload
+# is slow, e.g. on low-power boards)
+DIRTY_RECTS = os.environ.get("LUNAR_ROVER_DIRTY_RECTS") == "1"
+MENU_IDLE_MS = 1000  # Longest the main menu sleeps waiting for input
 
 # Lunar physics
 MOON_GRAVITY = 0.16  # Moon's gravity is about 1/6 of Earth's
 
+# Initialize pygame and open the game window
+def init_display():
+    global screen, display
+    pygame.init()
+    mixer.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    display = DirtyRectDisplay(screen.get_rect(), enabled=DIRTY_RECTS)
+    pygame.display.set_caption("Lunar Rover Race")
+    create_asset_directories()
+    return screen
+
 # Create directories for assets if they don't exist
-if not os.path.exists("assets"):
-    os.makedirs("assets")
-if not os.path.exists("assets/sounds"):
-    os.makedirs("assets/sounds")
-if not os.path.exists("assets/images"):
-    os.makedirs("assets/images")
+def create_asset_directories():
+    if not os.path.exists("assets"):
+        os.makedirs("assets")
+    if not os.path.exists("assets/sounds"):
+        os.makedirs("assets/sounds")
+    if not os.path.exists("assets/images"):
+        os.makedirs("assets/images")
 
 # Create simple rover sprite
 def create_rover_sprite():
@@ -59,6 +91,34 @@ def create_rover_sprite():
     
     return rover
 
+# Colors added on top of the rover sprite for each skin
+SKIN_TINTS = {"red": (255, 0, 0, 100), "green": (0, 255, 0, 100)}
+
+# Build one rover sprite variant; cached by rover_variants so this only
+# runs once per (skin, alpha, scale)
+def create_rover_variant(skin="default", alpha=255, scale=1):
+    rover = assets.get("rover_img").copy()
+    
+    # Tint the rover for colored skins
+    tint = SKIN_TINTS.get(skin)
+    if tint is not None:
+        tint_surface = pygame.Surface(rover.get_size(), pygame.SRCALPHA)
+        tint_surface.fill(tint)
+        rover.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    
+    if scale != 1:
+        width, height = rover.get_size()
+        rover = pygame.transform.smoothscale(rover, (int(width * scale), int(height * scale)))
+    
+    if pygame.display.get_surface() is not None:
+        rover = rover.convert_alpha()
+    
+    # Semi-transparent variants (the time trial ghost)
+    if alpha != 255:
+        rover.set_alpha(alpha)
+    
+    return rover
+
 # Create stars for background
 def create_starry_background():
     background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -116,234 +176,225 @@ def create_starry_background():
     
     return background
 
+# Create hazard and powerup sprites once, packed into a single atlas so
+# every entity is drawn with one blit
+def create_entity_atlas():
+    sprites = {}
+    
+    # Meteor (red circle with some details)
+    meteor = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(meteor, RED, (10, 10), 10)
+    pygame.draw.circle(meteor, (150, 50, 50), (6, 6), 3)
+    sprites["meteor"] = (meteor, (0, 0))
+    
+    # Laser beam (red rectangle seen through a 2 pixel glow on every side)
+    laser = pygame.Surface((14, 44), pygame.SRCALPHA)
+    pygame.draw.rect(laser, (255, 100, 100, 128), (0, 0, 14, 44))
+    pygame.draw.rect(laser, (255, 50, 50), (2, 2, 10, 40))
+    sprites["laser"] = (laser, (-2, -2))
+    
+    # Crater (gray ellipse with shadow)
+    crater = pygame.Surface((50, 10), pygame.SRCALPHA)
+    pygame.draw.ellipse(crater, GRAY, (0, 0, 50, 10))
+    pygame.draw.ellipse(crater, (50, 50, 50), (5, 5, 40, 5))
+    sprites["crater"] = (crater, (0, 0))
+    
+    # Boost powerup (green arrow, whose tip reaches one pixel past the box)
+    boost = pygame.Surface((21, 21), pygame.SRCALPHA)
+    boost.fill(GREEN, (0, 0, 20, 20))
+    pygame.draw.polygon(boost, (50, 200, 50), [(10, 0), (20, 10), (15, 10), (15, 20), (5, 20), (5, 10), (0, 10)])
+    sprites["boost"] = (boost, (0, 0))
+    
+    # Shield powerup (blue circle with shield symbol)
+    shield = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(shield, BLUE, (10, 10), 10)
+    pygame.draw.arc(shield, (100, 100, 255), (2, 2, 16, 16), 0, math.pi, 2)
+    sprites["shield"] = (shield, (0, 0))
+    
+    # Magnet powerup (yellow horseshoe)
+    magnet = pygame.Surface((20, 20), pygame.SRCALPHA)
+    magnet.fill(YELLOW)
+    pygame.draw.arc(magnet, (200, 200, 0), (2, 2, 16, 16), 0, math.pi, 3)
+    sprites["magnet"] = (magnet, (0, 0))
+    
+    # Fuel powerup (red canister)
+    fuel = pygame.Surface((20, 20), pygame.SRCALPHA)
+    fuel.fill(RED)
+    pygame.draw.rect(fuel, (200, 50, 50), (4, 2, 12, 16))
+    pygame.draw.rect(fuel, (250, 250, 250), (6, 4, 8, 12))
+    sprites["fuel"] = (fuel, (0, 0))
+    
+    # Coin (gold circle), plus a variant with the floating indicator below
+    coin = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(coin, (255, 215, 0), (10, 10), 10)
+    pygame.draw.circle(coin, (255, 235, 100), (10, 10), 6)
+    sprites["coin"] = (coin, (0, 0))
+    
+    coin_floating = pygame.Surface((20, 31), pygame.SRCALPHA)
+    coin_floating.blit(coin, (0, 0))
+    pygame.draw.line(coin_floating, WHITE, (10, 20), (10, 30), 1)
+    sprites["coin_floating"] = (coin_floating, (0, 0))
+    
+    return SpriteAtlas(sprites)
+
+# Sine tone whose pitch moves by `slope` Hz per sample, with optional tremolo
+def synth_sweep(sample_rate, max_sample, start_freq, slope, duration, volume, tremolo_rate=0, tremolo_depth=0):
+    t = sound_synth.timeline(duration, sample_rate)
+    wave = volume * sound_synth.sine(start_freq + t * slope, t, sample_rate)
+    if tremolo_rate:
+        wave = sound_synth.tremolo(wave, t, tremolo_rate, tremolo_depth, sample_rate)
+    return sound_synth.to_int16(wave, max_sample)
+
+# Sine tone that is louder for the first half of every `period` samples
+def synth_pulse(sample_rate, max_sample, freq, duration, volume, period, gain):
+    t = sound_synth.timeline(duration, sample_rate)
+    wave = volume * sound_synth.sine(freq, t, sample_rate)
+    wave[t % period < period // 2] *= gain
+    return sound_synth.to_int16(wave, max_sample)
+
+def synth_noise(sample_rate, max_sample, duration, volume):
+    t = sound_synth.timeline(duration, sample_rate)
+    return sound_synth.to_int16(volume * sound_synth.noise(len(t)), max_sample)
+
+# Mix of (frequency, amplitude) partials with a linear fade in/out in seconds
+def synth_tones(sample_rate, max_sample, partials, duration, fade=0):
+    t = sound_synth.timeline(duration, sample_rate)
+    wave = np.zeros(len(t))
+    for freq, amplitude in partials:
+        wave += amplitude * sound_synth.sine(freq, t, sample_rate)
+    if fade:
+        wave *= sound_synth.fade_envelope(len(t), fade * sample_rate, fade * sample_rate)
+    return sound_synth.to_int16(wave, max_sample)
+
+# Render part of one note of the background arpeggio (an octave harmonic,
+# ambient noise and a short fade in/out); t holds sample positions within a
+# note that is `length` samples long
+def render_arpeggio_note(note, t, length, sample_rate):
+    fade = 0.05 * sample_rate
+    # Add some harmonics for a richer sound
+    wave = 0.3 * sound_synth.sine(note[0], t, sample_rate) + 0.15 * sound_synth.sine(note[0] * 2, t, sample_rate)
+    # Add some ambient noise
+    wave += 0.05 * sound_synth.noise(len(t))
+    return wave * sound_synth.fade_envelope(length, fade, fade, t)
+
+# Space-themed background music (C major arpeggio), streamed in short chunks
+# and varied endlessly once the pattern has played through
+def create_space_music():
+    notes = [(262,), (330,), (392,), (523,)]  # C4, E4, G4, C5 (C major chord)
+    chunks = music_stream.chord_chunks(music_stream.chord_sequence(notes), render_arpeggio_note,
+                                       0.3, 22050, max_sample=16000)
+    return music_stream.MusicStream(chunks)
+
 # Create sound effects
 def load_sound_effects():
     sounds = {}
     
     # Create simple beep sounds with different frequencies
     try:
-        # Create simple beep sounds with different parameters
-        buffer_jump = bytearray()
-        buffer_boost = bytearray()
-        buffer_crash = bytearray()
-        buffer_powerup = bytearray()
-        buffer_engine = bytearray()
-        buffer_music = bytearray()
-        buffer_game_over = bytearray()
-        buffer_journey = bytearray()
-        
         sample_rate = 22050  # Lower sample rate for better compatibility
         max_sample = 16000  # Lower amplitude to avoid distortion
         
+        # Buffers are cached on disk, keyed by their synthesis parameters
+        def build(name, synth, *params):
+            pcm = sound_cache.default_cache.load(name, synth, (max_sample,) + params, sample_rate)
+            return pygame.mixer.Sound(buffer=pcm)
+        
         # Jump sound (higher pitch, short)
-        for i in range(int(0.2 * sample_rate)):
-            freq = 440 + i * 10  # Rising pitch
-            value = int(max_sample * 0.5 * math.sin(2 * math.pi * freq * i / sample_rate))
-            # Convert to 16-bit little-endian format
-            buffer_jump.extend([value & 0xFF, (value >> 8) & 0xFF])
+        sounds["jump"] = build("jump", synth_sweep, 440, 10, 0.2, 0.5)  # Rising pitch
         
         # Boost sound (medium pitch, medium length)
-        for i in range(int(0.3 * sample_rate)):
-            freq = 330
-            value = int(max_sample * 0.6 * math.sin(2 * math.pi * freq * i / sample_rate))
-            # Add some variation
-            if i % 1000 < 500:
-                value = int(value * 1.2)
-            buffer_boost.extend([value & 0xFF, (value >> 8) & 0xFF])
-        
-        # Crash sound (low pitch, longer)
-        for i in range(int(0.5 * sample_rate)):
-            # Random noise for crash
-            value = int(max_sample * 0.7 * random.uniform(-1, 1))
-            buffer_crash.extend([value & 0xFF, (value >> 8) & 0xFF])
+        sounds["boost"] = build("boost", synth_pulse, 330, 0.3, 0.6, 1000, 1.2)
+        
+        # Crash sound (random noise, longer)
+        sounds["crash"] = build("crash", synth_noise, 0.5, 0.7)
         
         # Powerup sound (high pitch, short)
-        for i in range(int(0.2 * sample_rate)):
-            freq = 660 - i * 5  # Falling pitch
-            value = int(max_sample * 0.5 * math.sin(2 * math.pi * freq * i / sample_rate))
-            buffer_powerup.extend([value & 0xFF, (value >> 8) & 0xFF])
+        sounds["powerup"] = build("powerup", synth_sweep, 660, -5, 0.2, 0.5)  # Falling pitch
         
         # Engine sound (low pitch, looping)
-        for i in range(int(0.5 * sample_rate)):
-            freq = 110
-            value = int(max_sample * 0.3 * math.sin(2 * math.pi * freq * i / sample_rate))
-            # Add some variation
-            value += int(max_sample * 0.1 * math.sin(2 * math.pi * (freq*2) * i / sample_rate))
-            buffer_engine.extend([value & 0xFF, (value >> 8) & 0xFF])
-        
-        # Game over sound (descending tone)
-        for i in range(int(1.0 * sample_rate)):
-            freq = 440 - i * 0.4  # Descending pitch
-            value = int(max_sample * 0.6 * math.sin(2 * math.pi * freq * i / sample_rate))
-            # Add tremolo effect
-            value = int(value * (0.5 + 0.5 * math.sin(2 * math.pi * 5 * i / sample_rate)))
-            buffer_game_over.extend([value & 0xFF, (value >> 8) & 0xFF])
-            
-        # Journey sound (pleasant chime)
-        for i in range(int(0.5 * sample_rate)):
-            # Combine two pleasant frequencies
-            freq1 = 523.25  # C5
-            freq2 = 659.25  # E5
-            value = int(max_sample * 0.3 * math.sin(2 * math.pi * freq1 * i / sample_rate))
-            value += int(max_sample * 0.3 * math.sin(2 * math.pi * freq2 * i / sample_rate))
-            # Add fade in/out
-            envelope = 1.0
-            if i < 0.1 * sample_rate:
-                envelope = i / (0.1 * sample_rate)
-            elif i > 0.4 * sample_rate:
-                envelope = 1.0 - (i - 0.4 * sample_rate) / (0.1 * sample_rate)
-            value = int(value * envelope)
-            buffer_journey.extend([value & 0xFF, (value >> 8) & 0xFF])
-        
-        # Space-themed background music
-        notes = [262, 330, 392, 523]  # C4, E4, G4, C5 (C major chord)
-        note_duration = int(0.3 * sample_rate)
-        for _ in range(3):  # Repeat the pattern
-            for note in notes:
-                for i in range(note_duration):
-                    # Add some harmonics for a richer sound
-                    value = int(max_sample * 0.3 * math.sin(2 * math.pi * note * i / sample_rate))
-                    value += int(max_sample * 0.15 * math.sin(2 * math.pi * note * 2 * i / sample_rate))
-                    # Add some ambient noise
-                    value += int(max_sample * 0.05 * random.uniform(-1, 1))
-                    # Add fade in/out for each note
-                    envelope = 1.0
-                    if i < 0.05 * sample_rate:
-                        envelope = i / (0.05 * sample_rate)
-                    elif i > note_duration - 0.05 * sample_rate:
-                        envelope = (note_duration - i) / (0.05 * sample_rate)
-                    value = int(value * envelope)
-                    buffer_music.extend([value & 0xFF, (value >> 8) & 0xFF])
-        
-        # Create sound objects
-        sounds["jump"] = pygame.mixer.Sound(buffer=buffer_jump)
-        sounds["boost"] = pygame.mixer.Sound(buffer=buffer_boost)
-        sounds["crash"] = pygame.mixer.Sound(buffer=buffer_crash)
-        sounds["powerup"] = pygame.mixer.Sound(buffer=buffer_powerup)
-        sounds["engine_idle"] = pygame.mixer.Sound(buffer=buffer_engine)
-        sounds["engine_low"] = pygame.mixer.Sound(buffer=buffer_engine)
-        sounds["engine_medium"] = pygame.mixer.Sound(buffer=buffer_engine)
-        sounds["engine_high"] = pygame.mixer.Sound(buffer=buffer_engine)
-        sounds["background_music"] = pygame.mixer.Sound(buffer=buffer_music)
-        sounds["game_over"] = pygame.mixer.Sound(buffer=buffer_game_over)
-        sounds["journey"] = pygame.mixer.Sound(buffer=buffer_journey)
+        engine = build("engine", synth_tones, ((110, 0.3), (220, 0.1)), 0.5)
+        sounds["engine_idle"] = engine
+        sounds["engine_low"] = engine
+        sounds["engine_medium"] = engine
+        sounds["engine_high"] = engine
+        
+        # Game over sound (descending tone with tremolo)
+        sounds["game_over"] = build("game_over", synth_sweep, 440, -0.4, 1.0, 0.6, 5, 0.5)
+        
+        # Journey sound (pleasant chime, C5 + E5 with fade in/out)
+        sounds["journey"] = build("journey", synth_tones, ((523.25, 0.3), (659.25, 0.3)), 0.5, 0.1)
         
     except Exception as e:
         print(f"Error creating sounds: {e}")
-        # Create dummy sound class if sound creation fails
-        class DummySound:
-            def play(self, loops=0):
-                pass
-            def stop(self):
-                pass
-        
-        # Fill with dummy sounds
-        sounds["jump"] = DummySound()
-        sounds["boost"] = DummySound()
-        sounds["crash"] = DummySound()
-        sounds["powerup"] = DummySound()
-        sounds["engine_idle"] = DummySound()
-        sounds["engine_low"] = DummySound()
-        sounds["engine_medium"] = DummySound()
-        sounds["engine_high"] = DummySound()
-        sounds["background_music"] = DummySound()
-        sounds["game_over"] = DummySound()
-        sounds["journey"] = DummySound()
+        sounds = silent_sound_effects()
     
     return sounds
 
-# Create assets
-rover_img = create_rover_sprite()
-background_img = create_starry_background()
-sounds = load_sound_effects()
+# Placeholder sound that plays nothing
+class DummySound:
+    def play(self, loops=0):
+        pass
+    def stop(self):
+        pass
 
-# Terrain generation
-class TerrainGenerator:
-    def __init__(self, screen_width, screen_height):
-        self.screen_width = screen_width
-        self.screen_height = screen_height
-        self.ground_height = screen_height * 0.7
-        self.segments = []
-        self.segment_width = 20
-        self.generate_initial_terrain()
-    
-    def generate_initial_terrain(self):
-        # Generate terrain segments that extend beyond the screen
-        for x in range(0, self.screen_width + 500, self.segment_width):
-            # Create some variation in height
-            height = self.ground_height + random.randint(-30, 30)
-            # Occasionally add craters or hills
-            if random.random() < 0.1:
-                # Crater
-                height += random.randint(20, 40)
-            elif random.random() < 0.1:
-                # Hill
-                height -= random.randint(20, 40)
-            
-            self.segments.append((x, height))
-    
-    def update(self, scroll_speed):
-        # Remove segments that have scrolled off screen
-        while self.segments and self.segments[0][0] < -self.segment_width:
-            self.segments.pop(0)
-        
-        # Add new segments at the right edge
-        last_x = self.segments[-1][0]
-        last_height = self.segments[-1][1]
-        
-        if last_x < self.screen_width + 500:
-            new_x = last_x + self.segment_width
-            # Smooth transition from last height
-            new_height = last_height + random.randint(-10, 10)
-            
-            # Occasionally add craters or hills
-            if random.random() < 0.1:
-                # Crater
-                new_height += random.randint(20, 40)
-            elif random.random() < 0.1:
-                # Hill
-                new_height -= random.randint(20, 40)
-            
-            # Keep height within reasonable bounds
-            new_height = max(min(new_height, self.ground_height + 50), self.ground_height - 50)
-            
-            self.segments.append((new_x, new_height))
-        
-        # Scroll all segments
-        for i in range(len(self.segments)):
-            self.segments[i] = (self.segments[i][0] - scroll_speed, self.segments[i][1])
-    
-    def draw(self, surface):
-        # Draw the terrain
-        for i in range(len(self.segments) - 1):
-            x1, y1 = self.segments[i]
-            x2, y2 = self.segments[i + 1]
-            
-            # Draw the segment
-            pygame.draw.polygon(surface, GRAY, [
-                (x1, y1), 
-                (x2, y2), 
-                (x2, self.screen_height), 
-                (x1, self.screen_height)
-            ])
-    
-    def get_height_at(self, x):
-        # Find the height of the terrain at position x
-        for i in range(len(self.segments) - 1):
-            x1, y1 = self.segments[i]
-            x2, y2 = self.segments[i + 1]
-            
-            if x1 <= x < x2:
-                # Linear interpolation
-                ratio = (x - x1) / (x2 - x1)
-                return y1 + ratio * (y2 - y1)
-        
-        # Default if not found
-        return self.ground_height
+# Sound table of dummy sounds, used when sound creation fails or audio is off
+def silent_sound_effects():
+    sounds = {}
+    sounds["jump"] = DummySound()
+    sounds["boost"] = DummySound()
+    sounds["crash"] = DummySound()
+    sounds["powerup"] = DummySound()
+    sounds["engine_idle"] = DummySound()
+    sounds["engine_low"] = DummySound()
+    sounds["engine_medium"] = DummySound()
+    sounds["engine_high"] = DummySound()
+    sounds["game_over"] = DummySound()
+    sounds["journey"] = DummySound()
+    return sounds
+
+# Background music stream, started from the main menu
+music = None
+
+def start_music():
+    global music
+    if music is None:
+        try:
+            music = create_space_music()
+            music.start()
+        except Exception as e:
+            print(f"Error starting music: {e}")
+            music = None
+
+def stop_music():
+    global music
+    if music is not None:
+        music.stop()
+        music = None
+
+# Assets are built on first use, or in the background by assets.preload()
+assets = AssetManager()
+assets.register("rover_img", create_rover_sprite)
+assets.register("background_img", create_starry_background)
+assets.register("entity_atlas", create_entity_atlas)
+assets.register("formations", load_formations)
+assets.register("sounds", load_sound_effects)
+sounds = assets.lazy_dict("sounds")
+rover_variants = VariantCache(create_rover_variant)
+text_cache = TextRenderer()  # Fonts and rendered strings for HUD, menu and popups
+
+# Where on screen to draw an entity, `alpha` of the way from its position
+# before the last simulation step to its current one. Interpolates screen
+# positions (world x minus the camera before and after the step), so
+# something keeping pace with the camera stays on the same pixel.
+def interpolated_position(entity, alpha, camera_x=0.0, previous_camera_x=0.0):
+    previous_x = entity.prev_x - previous_camera_x
+    x = entity.x - camera_x
+    return (previous_x + (x - previous_x) * alpha,
+            entity.prev_y + (entity.y - entity.prev_y) * alpha)
 
 # Player class
 class Rover:
-    def __init__(self, x, y):
+    def __init__(self, x, y, player_index=0):
         self.x = x
         self.y = y
         self.width = 50
@@ -355,16 +406,16 @@ class Rover:
         self.fuel = 100  # Maximum fuel level
         self.fuel_consumption_rate = 0.1  # Fuel consumed per frame
         self.boosting = False
-        self.boost_time = 0
         self.shield_active = False
-        self.shield_time = 0
+        self.magnet_active = False
+        self.effects = EffectTimers(self, ROVER_EFFECTS)  # Boost, shield, magnet and jump points
         self.skin = "default"  # default or red or green
         self.skins = {"default": "blue", "red": "red", "green": "green"}
-        self.engine_sound_playing = False
-        self.engine_sound_channel = None
+        self.engine_audio = EngineAudio(sounds, player_index)  # One mixer channel per player slot
         self.score = 0  # Player's score
         self.jump_height = 0  # Track jump height for scoring
         self.max_jump_height = 0  # Track maximum jump height
+        self.prev_x, self.prev_y = x, y  # Position before the last simulation step
     
     def update(self, terrain, keys):
         # Apply gravity
@@ -389,7 +440,7 @@ class Rover:
         # Track jump height for scoring
         if self.jumping:
             # Calculate height from ground
-            terrain_height = terrain.get_height_at(self.x + self.width / 2)
+            terrain_height = terrain.height_at_world(self.x + self.width / 2)
             current_height = terrain_height - (self.y + self.height)
             self.jump_height = current_height
             
@@ -398,7 +449,7 @@ class Rover:
                 self.max_jump_height = current_height
         
         # Check for collision with terrain
-        terrain_height = terrain.get_height_at(self.x + self.width / 2)
+        terrain_height = terrain.height_at_world(self.x + self.width / 2)
         if self.y + self.height > terrain_height:
             self.y = terrain_height - self.height
             self.vel_y = 0
@@ -411,8 +462,9 @@ class Rover:
                     # Show jump points text
                     self.show_jump_points = True
                     self.jump_points_value = jump_points
-                    self.jump_points_timer = 60  # Show for 1 second
-                    self.jump_points_x = self.x
+                    self.effects.start("jump_points")
+                    # Screen position: the text stays where it appeared
+                    self.jump_points_x = self.x - terrain.world_x
                     self.jump_points_y = self.y - 20
             
             self.jumping = False
@@ -420,17 +472,12 @@ class Rover:
         
         # Handle boosting
         if self.boosting:
-            self.boost_time -= 1
             self.fuel -= 0.3  # Boosting consumes more fuel
-            if self.boost_time <= 0 or self.fuel <= 0:
-                self.boosting = False
-                self.speed = 5
+            if self.fuel <= 0:
+                self.effects.end("boost")
         
-        # Handle shield
-        if self.shield_active:
-            self.shield_time -= 1
-            if self.shield_time <= 0:
-                self.shield_active = False
+        # End the timed effects that ran out
+        self.effects.advance()
         
         # Update engine sound based on speed
         self.update_engine_sound()
@@ -445,82 +492,63 @@ class Rover:
         # If out of fuel, reduce speed
         if self.fuel <= 0:
             self.speed = max(1, self.speed - 0.1)  # Gradually slow down
-        
-        # Update jump points display
-        if hasattr(self, 'show_jump_points') and self.show_jump_points:
-            self.jump_points_timer -= 1
-            self.jump_points_y -= 1  # Float upward
-            if self.jump_points_timer <= 0:
-                self.show_jump_points = False
     
     def update_engine_sound(self):
-        # Determine which engine sound to play based on speed
-        if self.boosting:
-            engine_sound = sounds["engine_high"]
-        elif self.speed > 7:
-            engine_sound = sounds["engine_medium"]
-        elif self.speed > 3:
-            engine_sound = sounds["engine_low"]
-        else:
-            engine_sound = sounds["engine_idle"]
-        
-        # Play the appropriate engine sound if not already playing
-        if not self.engine_sound_playing:
-            self.engine_sound_channel = engine_sound.play(-1)  # Loop indefinitely
-            self.engine_sound_playing = True
-        else:
-            # Stop current sound and play new one if speed changed
-            if self.engine_sound_channel is not None:
-                self.engine_sound_channel.stop()
-            self.engine_sound_channel = engine_sound.play(-1)
+        # Switches the looping engine sound only when the speed tier changes
+        self.engine_audio.update(self.speed, self.boosting)
     
-    def draw(self, surface):
-        # Draw the rover with different colors based on skin
-        rover_copy = rover_img.copy()
-        
-        if self.skin == "red":
-            # Tint the rover red
-            red_tint = pygame.Surface(rover_copy.get_size(), pygame.SRCALPHA)
-            red_tint.fill((255, 0, 0, 100))
-            rover_copy.blit(red_tint, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-        elif self.skin == "green":
-            # Tint the rover green
-            green_tint = pygame.Surface(rover_copy.get_size(), pygame.SRCALPHA)
-            green_tint.fill((0, 255, 0, 100))
-            rover_copy.blit(green_tint, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    # Draw the rover as seen from the camera (the world x of the left edge
+    # of the screen) before and after the last step. Returns the screen
+    # rects that were drawn.
+    def draw(self, surface, alpha=1.0, camera_x=0.0, previous_camera_x=0.0):
+        x, y = interpolated_position(self, alpha, camera_x, previous_camera_x)
         
-        surface.blit(rover_copy, (self.x, self.y))
+        # Draw the rover with different colors based on skin
+        rects = [surface.blit(rover_variants.get(self.skin), (x, y))]
         
         # Draw shield if active
         if self.shield_active:
-            pygame.draw.circle(surface, BLUE, (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(max(self.width, self.height) * 0.7), 2)
+            rects.append(pygame.draw.circle(surface, BLUE, (int(x + self.width / 2), int(y + self.height / 2)), 
+                                            int(max(self.width, self.height) * 0.7), 2))
         
         # Draw jump points if active
         if hasattr(self, 'show_jump_points') and self.show_jump_points:
-            font = pygame.font.Font(None, 24)
-            points_text = font.render(f"+{self.jump_points_value}", True, (255, 255, 0))
-            surface.blit(points_text, (self.jump_points_x, self.jump_points_y))
+            points_text = text_cache.render(f"+{self.jump_points_value}", (255, 255, 0), 24)
+            rise = self.effects.elapsed("jump_points")  # Floats up a pixel per step
+            rects.append(surface.blit(points_text, (self.jump_points_x, self.jump_points_y - rise)))
             
         # Draw jump height indicator when jumping
         if self.jumping:
             # Draw a line showing jump height
-            pygame.draw.line(surface, (255, 255, 0), 
-                            (self.x + self.width + 5, self.y + self.height),
-                            (self.x + self.width + 5, self.y + self.height - self.jump_height),
-                            2)
-    
-    def activate_boost(self):
-        if self.fuel > 10:  # Only activate boost if enough fuel
-            self.boosting = True
-            self.boost_time = 180  # 3 seconds at 60 FPS
-            self.speed = 10
-            sounds["boost"].play()
-    
-    def activate_shield(self):
+            rects.append(pygame.draw.line(surface, (255, 255, 0), 
+                                          (x + self.width + 5, y + self.height),
+                                          (x + self.width + 5, y + self.height - self.jump_height),
+                                          2))
+        return rects
+    
+    # Timed effect callbacks (see ROVER_EFFECTS)
+    def start_boost(self):
+        self.boosting = True
+        self.speed = 10
+    
+    def end_boost(self):
+        self.boosting = False
+        self.speed = 5
+    
+    def start_shield(self):
         self.shield_active = True
-        self.shield_time = 300  # 5 seconds at 60 FPS
-        sounds["powerup"].play()
+    
+    def end_shield(self):
+        self.shield_active = False
+    
+    def start_magnet(self):
+        self.magnet_active = True
+    
+    def end_magnet(self):
+        self.magnet_active = False
+    
+    def hide_jump_points(self):
+        self.show_jump_points = False
         
     def add_fuel(self, amount):
         self.fuel = min(100, self.fuel + amount)
@@ -528,195 +556,277 @@ class Rover:
     def add_score(self, points):
         self.score += points
 
-# Hazard class
-class Hazard:
-    def __init__(self, x, y, hazard_type):
-        self.x = x
-        self.y = y
-        self.type = hazard_type
-        self.width = 30
-        self.height = 30
-        self.active = True
-        
-        if hazard_type == "meteor":
-            self.width = 20
-            self.height = 20
-        elif hazard_type == "laser":
-            self.width = 10
-            self.height = 40
-        elif hazard_type == "crater":
-            self.width = 50
-            self.height = 10
-    
-    def update(self, scroll_speed):
-        self.x -= scroll_speed
-        
-        # Deactivate if off screen
-        if self.x + self.width < 0:
-            self.active = False
-    
-    def draw(self, surface):
-        if not self.active:
-            return
-            
-        if self.type == "meteor":
-            # Draw a meteor (red circle with some details)
-            pygame.draw.circle(surface, RED, (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(self.width / 2))
-            # Add some meteor details
-            pygame.draw.circle(surface, (150, 50, 50), 
-                              (int(self.x + self.width / 3), int(self.y + self.height / 3)), 
-                              int(self.width / 6))
-        elif self.type == "laser":
-            # Draw a laser beam (red rectangle with glow)
-            pygame.draw.rect(surface, RED, (self.x, self.y, self.width, self.height))
-            # Add glow effect
-            glow_surf = pygame.Surface((self.width + 4, self.height + 4), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surf, (255, 100, 100, 128), (0, 0, self.width + 4, self.height + 4))
-            surface.blit(glow_surf, (self.x - 2, self.y - 2))
-        elif self.type == "crater":
-            # Draw a crater (gray ellipse with shadow)
-            pygame.draw.ellipse(surface, GRAY, (self.x, self.y, self.width, self.height))
-            # Add shadow
-            pygame.draw.ellipse(surface, (50, 50, 50), (self.x + 5, self.y + 5, self.width - 10, self.height - 5))
-    
-    def check_collision(self, rover):
-        if not self.active:
+# Timed effects a rover can have, with their durations in steps
+ROVER_EFFECTS = {
+    "boost": Effect(180, on_start=Rover.start_boost, on_end=Rover.end_boost),  # 3 seconds
+    "shield": Effect(300, on_start=Rover.start_shield, on_end=Rover.end_shield),  # 5 seconds
+    "magnet": Effect(300, on_start=Rover.start_magnet, on_end=Rover.end_magnet),  # 5 seconds
+    "jump_points": Effect(60, on_end=Rover.hide_jump_points),  # Points popup, 1 second
+}
+
+# While a rover's magnet runs, coins within MAGNET_RADIUS of it move
+# MAGNET_PULL pixels towards it every step
+MAGNET_RADIUS = 150
+MAGNET_PULL = 8
+
+# What collecting a powerup does: start a timed effect on the rover, add
+# fuel or points (more for floating coins), and play a sound. Airborne
+# pickups are only collected while jumping or with a magnet running. At or
+# below min_fuel a pickup is used up without doing anything.
+class Pickup:
+    def __init__(self, effect=None, fuel=0, score=0, floating_score=None, sound="powerup", airborne=False, min_fuel=None):
+        self.effect = effect
+        self.fuel = fuel
+        self.score = score
+        self.floating_score = floating_score
+        self.sound = sound
+        self.airborne = airborne
+        self.min_fuel = min_fuel
+    
+    # Returns whether the powerup was used up
+    def collect(self, player, floating=False):
+        if self.airborne and not (player.jumping or player.magnet_active):
             return False
-            
-        # Simple rectangle collision
-        rover_rect = pygame.Rect(rover.x, rover.y, rover.width, rover.height)
-        hazard_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        return rover_rect.colliderect(hazard_rect)
+        if self.min_fuel is not None and player.fuel <= self.min_fuel:
+            return True
+        if self.effect:
+            player.effects.start(self.effect)
+        if self.fuel:
+            player.add_fuel(self.fuel)
+        if self.score:
+            player.add_score(self.floating_score if floating and self.floating_score else self.score)
+        sounds[self.sound].play()
+        return True
+
+PICKUPS = {
+    "boost": Pickup(effect="boost", sound="boost", min_fuel=10),  # Only boost with enough fuel
+    "shield": Pickup(effect="shield"),
+    "magnet": Pickup(effect="magnet"),
+    "fuel": Pickup(fuel=30),
+    "coin": Pickup(score=100, floating_score=250, airborne=True),
+}
+
+# Hazard types and their sizes
+HAZARD_SIZES = {"meteor": (20, 20), "laser": (10, 40), "crater": (50, 10)}
+
+# Power-up types; floating coins have a sprite of their own
+POWERUP_TYPES = ("boost", "shield", "magnet", "fuel", "coin")
+POWERUP_SPRITES = POWERUP_TYPES + ("coin_floating",)
+
+# What gets spawned, how often (in simulation steps) and how likely it is
+# to happen each time. Intervals and chances can also be functions of the
+# step, e.g. spawn_schedule.ramp(), to make a run harder as it goes on.
+HAZARD_TABLE = WeightedTable({"meteor": 1, "laser": 1, "crater": 1})
+HAZARD_INTERVAL = 120  # Every 2 seconds
+HAZARD_CHANCE = 0.7
+PATH_COIN_INTERVAL = 240  # Every 4 seconds
+POWERUP_TABLE = WeightedTable({"boost": 1, "shield": 1, "magnet": 1, "fuel": 1, "coin": 3})  # Coins are more common
+POWERUP_INTERVAL = 300  # Every 5 seconds
+POWERUP_CHANCE = 0.7
+
+# Up to this many hazards or powerups, collisions are found by testing
+# every one of them (see Game.collisions and benchmarks/bench_entities.py)
+SMALL_STORE = 64
+
+# How far entity sprites can reach past the entity's box (the laser glow),
+# so ones just off screen still get drawn
+SPRITE_MARGIN = 2
+
+# Hazards and power-ups live in EntityStores (see Game); these are the
+# per-entity views handed out when iterating over them
+
+# Hazard class
+class Hazard(EntityView):
+    __slots__ = ()
 
 # PowerUp class
-class PowerUp:
-    def __init__(self, x, y, power_type, force_floating=False):
-        self.x = x
-        self.y = y
-        self.type = power_type
-        self.width = 20
-        self.height = 20
-        self.active = True
-        
-        # Make coins float by default or if forced
-        if power_type == "coin" or force_floating:
-            self.floating = True
-            if not force_floating and random.random() < 0.5:
-                # Float higher for some coins
-                self.y -= random.randint(50, 150)
-        else:
-            self.floating = False
+class PowerUp(EntityView):
+    __slots__ = ()
+
+# Player stats and high score, drawn into cached surfaces: one per
+# player's stat block and one for the high score. A block is only redrawn
+# when something it shows changes (integer score, health, fuel bar width
+# and color, high score), and only the blocks are blitted each frame, not
+# the transparent space between them.
+class Hud:
+    def __init__(self, num_players):
+        self.player_surfaces = [self.block(self.player_rect(i)) for i in range(num_players)]
+        self.high_score_surface = self.block(self.high_score_rect)
+        self.player_states = [None] * num_players
+        self.high_score = None
+        self.hits = 0
+        self.rebuilds = 0
     
-    def update(self, scroll_speed):
-        self.x -= scroll_speed
-        
-        # Deactivate if off screen
-        if self.x + self.width < 0:
-            self.active = False
+    # A transparent surface the size of rect, in the display's pixel format
+    # when there is a display, so blitting it is cheap
+    def block(self, rect):
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
     
-    def draw(self, surface):
-        if not self.active:
-            return
-            
-        if self.type == "boost":
-            # Draw a boost powerup (green arrow)
-            pygame.draw.rect(surface, GREEN, (self.x, self.y, self.width, self.height))
-            # Draw arrow shape
-            points = [
-                (self.x + self.width/2, self.y),
-                (self.x + self.width, self.y + self.height/2),
-                (self.x + 3*self.width/4, self.y + self.height/2),
-                (self.x + 3*self.width/4, self.y + self.height),
-                (self.x + self.width/4, self.y + self.height),
-                (self.x + self.width/4, self.y + self.height/2),
-                (self.x, self.y + self.height/2)
-            ]
-            pygame.draw.polygon(surface, (50, 200, 50), points)
-        elif self.type == "shield":
-            # Draw a shield powerup (blue circle)
-            pygame.draw.circle(surface, BLUE, (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(self.width / 2))
-            # Draw shield symbol
-            pygame.draw.arc(surface, (100, 100, 255), 
-                           (self.x + 2, self.y + 2, self.width - 4, self.height - 4),
-                           0, math.pi, 2)
-        elif self.type == "magnet":
-            # Draw a magnet powerup (yellow horseshoe)
-            pygame.draw.rect(surface, YELLOW, (self.x, self.y, self.width, self.height))
-            # Draw magnet symbol
-            pygame.draw.arc(surface, (200, 200, 0), 
-                           (self.x + 2, self.y + 2, self.width - 4, self.height - 4),
-                           0, math.pi, 3)
-        elif self.type == "fuel":
-            # Draw a fuel powerup (red canister)
-            pygame.draw.rect(surface, RED, (self.x, self.y, self.width, self.height))
-            # Draw fuel symbol
-            pygame.draw.rect(surface, (200, 50, 50), 
-                            (self.x + 4, self.y + 2, self.width - 8, self.height - 4))
-            pygame.draw.rect(surface, (250, 250, 250), 
-                            (self.x + 6, self.y + 4, self.width - 12, self.height - 8))
-        elif self.type == "coin":
-            # Draw a coin (gold circle)
-            pygame.draw.circle(surface, (255, 215, 0), (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(self.width / 2))
-            # Draw coin details
-            pygame.draw.circle(surface, (255, 235, 100), 
-                              (int(self.x + self.width / 2), int(self.y + self.height / 2)), 
-                              int(self.width / 3))
-            
-            # If floating, draw a small indicator
-            if self.floating:
-                pygame.draw.line(surface, (255, 255, 255), 
-                                (self.x + self.width/2, self.y + self.height),
-                                (self.x + self.width/2, self.y + self.height + 10),
-                                1)
-    
-    def check_collision(self, rover):
-        if not self.active:
-            return False
-            
-        # Simple rectangle collision
-        rover_rect = pygame.Rect(rover.x, rover.y, rover.width, rover.height)
-        powerup_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        return rover_rect.colliderect(powerup_rect)
+    # Everything a player's block shows, as it is shown
+    def player_state(self, player):
+        return int(player.score), player.health, int(player.fuel), player.fuel > 30, player.fuel > 10
+    
+    def player_rect(self, i):
+        return pygame.Rect(0, 10 + i * 100, 300, 100)
+    
+    # Drawn at the top left of the block's own surface
+    def draw_player(self, i, player):
+        surface = self.player_surfaces[i]
+        surface.fill((0, 0, 0, 0))
+        
+        # Draw score
+        score_text = text_cache.render(f"P{i+1} Score: {int(player.score)}", WHITE, 36)
+        surface.blit(score_text, (10, 0))
+        
+        # Draw health bar
+        health_text = text_cache.render("Health:", WHITE, 36)
+        surface.blit(health_text, (10, 40))
+        pygame.draw.rect(surface, RED, (100, 45, 100, 15))
+        pygame.draw.rect(surface, GREEN, (100, 45, player.health, 15))
+        
+        # Draw fuel bar
+        fuel_text = text_cache.render("Fuel:", WHITE, 36)
+        surface.blit(fuel_text, (10, 70))
+        pygame.draw.rect(surface, (100, 100, 100), (100, 75, 100, 15))
+        fuel_color = (0, 255, 255) if player.fuel > 30 else (255, 165, 0) if player.fuel > 10 else RED
+        pygame.draw.rect(surface, fuel_color, (100, 75, player.fuel, 15))
+    
+    high_score_rect = pygame.Rect(SCREEN_WIDTH - 250, 0, 250, 110)
+    
+    def draw_high_score(self, high_score):
+        self.high_score_surface.fill((0, 0, 0, 0))
+        if high_score is not None:
+            high_score_text = text_cache.render(f"High Score: {high_score}", YELLOW, 36)
+            self.high_score_surface.blit(high_score_text, (0, 10))
+    
+    # Returns the rects of the blocks that changed
+    def draw(self, surface, players, high_score):
+        changed = []
+        for i, player in enumerate(players):
+            state = self.player_state(player)
+            if state != self.player_states[i]:
+                self.draw_player(i, player)
+                self.player_states[i] = state
+                changed.append(self.player_rect(i))
+        if high_score != self.high_score:
+            self.draw_high_score(high_score)
+            self.high_score = high_score
+            changed.append(self.high_score_rect)
+        
+        if changed:
+            self.rebuilds += 1
+        else:
+            self.hits += 1
+        blocks = [(block, self.player_rect(i)) for i, block in enumerate(self.player_surfaces)]
+        blocks.append((self.high_score_surface, self.high_score_rect))
+        surface.blits(blocks, doreturn=False)
+        return changed
 
 # Game state
 class Game:
-    def __init__(self, num_players=1):
+    def __init__(self, num_players=1, seed=None):
         self.num_players = num_players
-        self.terrain = TerrainGenerator(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.terrain = TerrainGenerator(SCREEN_WIDTH, SCREEN_HEIGHT, seed)
         self.players = [Rover(100, 300)]
         if num_players == 2:
-            self.players.append(Rover(150, 300))
+            self.players.append(Rover(150, 300, 1))
             self.players[1].skin = "red"  # Second player uses red rover
         
         self.scroll_speed = 5
-        self.hazards = []
-        self.powerups = []
+        # Everything is positioned in world coordinates; the camera (the
+        # world x of the left edge of the screen) moves along the course at
+        # scroll_speed, and the rovers keep pace with it
+        self.camera_x = 0.0
+        self.previous_camera_x = 0.0  # Camera before the last simulation step
+        self.hazards = EntityStore(HAZARD_SIZES, view=Hazard)
+        self.powerups = EntityStore(POWERUP_TYPES, POWERUP_SPRITES, flags=("floating",), view=PowerUp)
         self.score = 0
         self.game_over = False
-        self.hazard_timer = 0
-        self.powerup_timer = 0
-        self.path_coin_timer = 0  # Timer for coins in the pathway
+        
+        # Hazards, pathway coins and powerups arrive on a schedule
+        self.spawner = SpawnScheduler()
+        self.spawner.add_rule(SpawnRule(HAZARD_INTERVAL, self.spawn_hazard, HAZARD_CHANCE, HAZARD_TABLE))
+        self.spawner.add_rule(SpawnRule(PATH_COIN_INTERVAL, self.spawn_path))
+        self.spawner.add_rule(SpawnRule(POWERUP_INTERVAL, self.spawn_powerup, POWERUP_CHANCE, POWERUP_TABLE))
         
         # Ghost data for time trials
         self.recording_ghost = False
-        self.ghost_data = []
+        self.ghost_recorder = GhostRecorder()  # Player 1's path while recording
         self.playing_ghost = False
+        self.ghost = None  # GhostPlayer being raced against
         self.ghost_position = []
-        self.ghost_index = 0
+        self.previous_ghost_position = []
+        self.ghost_offset = 0.0  # World x added to the ghost's path since it last started over
+        
+        self.hud = Hud(len(self.players))
+        self.input = pygame.key.get_pressed  # Keys held this step; scripted when headless
+        self.shown_game_over = None  # Game-over state of the last frame drawn
         
         # Load high score
         self.load_high_score()
         
         # Spawn initial fuel powerups
-        for _ in range(3):
-            x = random.randint(SCREEN_WIDTH // 2, SCREEN_WIDTH)
-            y = random.randint(100, int(self.terrain.ground_height) - 50)
-            self.powerups.append(PowerUp(x, y, "fuel"))
+        xs = [random.randint(SCREEN_WIDTH // 2, SCREEN_WIDTH) for _ in range(3)]
+        for x, surface_y in zip(xs, self.terrain.heights_at_world(xs)):
+            y = random.randint(100, int(surface_y) - 50)
+            self.add_powerup(x, y, "fuel")
+    
+    def add_hazard(self, x, y, hazard_type):
+        width, height = HAZARD_SIZES[hazard_type]
+        return self.hazards.add(x, y, width, height, hazard_type)
+    
+    def add_powerup(self, x, y, power_type, force_floating=False):
+        # Make coins float by default or if forced
+        floating = power_type == "coin" or force_floating
+        if floating and not force_floating and random.random() < 0.5:
+            # Float higher for some coins
+            y -= random.randint(50, 150)
+        sprite = "coin_floating" if power_type == "coin" and floating else power_type
+        return self.powerups.add(x, y, 20, 20, power_type, sprite, floating=floating)
+    
+    # Spawn handlers for the schedule (see SpawnScheduler)
+    def spawn_hazard(self, hazard_type):
+        x = self.camera_x + SCREEN_WIDTH + 50
+        y = random.randint(100, int(self.terrain.height_at_world(x)) - 50)
+        self.add_hazard(x, y, hazard_type)
+    
+    # A pathway of coins, with fuel in the middle of it most of the time
+    def spawn_path(self):
+        self.generate_path_coins()
+        
+        if random.random() < 0.7:  # 70% chance to spawn fuel
+            x = self.camera_x + SCREEN_WIDTH + 150  # Middle of the pathway
+            y = int(self.terrain.height_at_world(x)) - 50
+            self.add_powerup(x, y, "fuel")
+            
+            # Play journey sound occasionally
+            sounds["journey"].play()
+    
+    def spawn_powerup(self, power_type):
+        x = self.camera_x + SCREEN_WIDTH + 50
+        
+        # Position based on type
+        if power_type == "coin" and random.random() < 0.7:
+            # Position coins in patterns that require jumping
+            self.spawn_formation(random.choice(assets.get("formations")["pickup"]), x)
+        else:
+            # Normal ground-level powerup
+            y = random.randint(100, int(self.terrain.height_at_world(x)) - 50)
+            self.add_powerup(x, y, power_type)
+    
+    # Queue a scripted wave: (steps from now, hazard or powerup type) pairs,
+    # spawned on top of the regular schedule
+    def schedule_wave(self, wave, delay=0):
+        self.spawner.add_wave(wave, self.spawn, delay)
+    
+    def spawn(self, kind):
+        if kind in HAZARD_SIZES:
+            self.spawn_hazard(kind)
+        else:
+            self.spawn_powerup(kind)
     
     def load_high_score(self):
         try:
@@ -735,16 +845,43 @@ class Game:
             except:
                 pass
     
+    # Keep the time-trial ghost recorded so far for next time, and return a
+    # GhostPlayer for it (played from the saved file when it could be saved)
+    def save_ghost(self):
+        if self.ghost is not None:
+            self.ghost.close()  # It may be the file saved over
+        try:
+            self.ghost_recorder.save(seed=self.terrain.seed)
+            ghost = load_ghost()
+        except OSError:
+            ghost = None
+        if ghost is None:
+            ghost = self.ghost_recorder.player(self.terrain.seed)
+        return ghost
+    
+    # Advance the game by one simulation step
     def update(self):
         if self.game_over:
             return
+        
+        # Remember where everything moving was, so frames drawn between
+        # steps can interpolate
+        self.previous_camera_x = self.camera_x
+        for player in self.players:
+            player.prev_x, player.prev_y = player.x, player.y
+        self.previous_ghost_position = self.ghost_position
+        
+        # Move the camera along the course, with the rovers keeping pace
+        self.camera_x += self.scroll_speed
+        for player in self.players:
+            player.x += self.scroll_speed
             
         # Update terrain
         self.terrain.update(self.scroll_speed)
         
         # Update players
+        keys = self.input()
         for i, player in enumerate(self.players):
-            keys = pygame.key.get_pressed()
             if i == 0:  # First player controls
                 if keys[pygame.K_LEFT] and player.fuel > 0:
                     player.x -= player.speed
@@ -761,13 +898,13 @@ class Game:
                     player.fuel -= 5  # Jumping consumes fuel
             
             # Keep player on screen
-            player.x = max(0, min(player.x, SCREEN_WIDTH - player.width))
+            player.x = max(self.camera_x, min(player.x, self.camera_x + SCREEN_WIDTH - player.width))
             
             player.update(self.terrain, keys)
             
             # Record ghost data if in time trial mode
             if self.recording_ghost and i == 0:
-                self.ghost_data.append((player.x, player.y))
+                self.ghost_recorder.record(player.x, player.y)
             
             # Check if player is out of fuel
             if player.fuel <= 0:
@@ -775,91 +912,33 @@ class Game:
                 sounds["game_over"].play()
         
         # Update ghost if playing
-        if self.playing_ghost and self.ghost_data:
-            if self.ghost_index < len(self.ghost_data):
-                self.ghost_position = self.ghost_data[self.ghost_index]
-                self.ghost_index += 1
-            else:
-                self.ghost_index = 0
-        
-        # Generate hazards
-        self.hazard_timer += 1
-        if self.hazard_timer >= 120:  # Every 2 seconds
-            self.hazard_timer = 0
-            if random.random() < 0.7:  # 70% chance to spawn a hazard
-                hazard_type = random.choice(["meteor", "laser", "crater"])
-                x = SCREEN_WIDTH + 50
-                y = random.randint(100, int(self.terrain.ground_height) - 50)
-                self.hazards.append(Hazard(x, y, hazard_type))
-        
-        # Generate pathway coins and fuel every 4 seconds
-        self.path_coin_timer += 1
-        if self.path_coin_timer >= 240:  # Every 4 seconds (60 FPS * 4)
-            self.path_coin_timer = 0
-            self.generate_path_coins()
-            
-            # Add fuel in the middle of the pathway
-            if random.random() < 0.7:  # 70% chance to spawn fuel
-                x = SCREEN_WIDTH + 150  # Middle of the pathway
-                y = int(self.terrain.ground_height) - 50
-                self.powerups.append(PowerUp(x, y, "fuel"))
-                
-                # Play journey sound occasionally
-                sounds["journey"].play()
-        
-        # Generate powerups
-        self.powerup_timer += 1
-        if self.powerup_timer >= 300:  # Every 5 seconds
-            self.powerup_timer = 0
-            if random.random() < 0.7:  # 70% chance to spawn a powerup
-                # Choose powerup type with different probabilities
-                power_type_choices = ["boost", "shield", "magnet", "fuel", "coin", "coin", "coin"]
-                power_type = random.choice(power_type_choices)  # Coins are more common
-                x = SCREEN_WIDTH + 50
-                
-                # Position based on type
-                if power_type == "coin" and random.random() < 0.7:
-                    # Position coins in patterns that require jumping
-                    pattern = random.choice(["arc", "steps", "line"])
-                    
-                    if pattern == "arc":
-                        # Create an arc of coins
-                        for i in range(5):
-                            angle = math.pi * (0.25 + i * 0.1)  # Arc from 45 to 90 degrees
-                            radius = 100
-                            coin_x = x + i * 30
-                            coin_y = int(self.terrain.ground_height) - 50 - int(math.sin(angle) * radius)
-                            self.powerups.append(PowerUp(coin_x, coin_y, "coin", True))  # Force floating
-                    
-                    elif pattern == "steps":
-                        # Create ascending steps of coins
-                        for i in range(4):
-                            coin_x = x + i * 40
-                            coin_y = int(self.terrain.ground_height) - 50 - i * 30
-                            self.powerups.append(PowerUp(coin_x, coin_y, "coin", True))  # Force floating
-                    
-                    else:  # line
-                        # Create a horizontal line of coins above ground
-                        height = random.randint(50, 150)
-                        for i in range(5):
-                            coin_x = x + i * 30
-                            coin_y = int(self.terrain.ground_height) - 50 - height
-                            self.powerups.append(PowerUp(coin_x, coin_y, "coin", True))  # Force floating
-                else:
-                    # Normal ground-level powerup
-                    y = random.randint(100, int(self.terrain.ground_height) - 50)
-                    self.powerups.append(PowerUp(x, y, power_type))
-        
-        # Update hazards and check collisions
-        for hazard in self.hazards[:]:
-            hazard.update(self.scroll_speed)
-            
-            if not hazard.active:
-                self.hazards.remove(hazard)
-                continue
-                
-            for player in self.players:
-                if hazard.check_collision(player) and not player.shield_active:
+        if self.playing_ghost and self.ghost is not None:
+            position = self.ghost.advance()
+            if position is None:
+                # Start over from where the camera is now, as the path was
+                # recorded from a camera at 0
+                self.ghost.rewind()
+                self.ghost_offset = self.previous_camera_x
+                self.previous_ghost_position = []  # Nothing to interpolate from
+                position = self.ghost.advance()
+            if position is not None:
+                self.ghost_position = (position[0] + self.ghost_offset, position[1])
+        
+        # Spawn whatever is due this step
+        self.spawner.advance()
+        
+        # Forget hazards and powerups that went off the left of the screen
+        # or were used up
+        for entities in (self.hazards, self.powerups):
+            entities.cull(self.camera_x)
+        
+        # Rovers with a magnet pull nearby coins in
+        self.attract_coins()
+        
+        # Check hazard collisions
+        for hazard, players in self.collisions(self.hazards):
+            for player in players:
+                if hazard.active and not player.shield_active:
                     player.health -= 10
                     hazard.active = False
                     sounds["crash"].play()
@@ -868,40 +947,11 @@ class Game:
                         self.game_over = True
                         sounds["game_over"].play()
         
-        # Update powerups and check collisions
-        for powerup in self.powerups[:]:
-            powerup.update(self.scroll_speed)
-            
-            if not powerup.active:
-                self.powerups.remove(powerup)
-                continue
-                
-            for player in self.players:
-                if powerup.check_collision(player):
-                    # Only collect coins if jumping or if they're not coins
-                    if powerup.type != "coin" or player.jumping:
-                        if powerup.type == "boost":
-                            player.activate_boost()
-                        elif powerup.type == "shield":
-                            player.activate_shield()
-                        elif powerup.type == "magnet":
-                            # Implement magnet effect (higher jumps)
-                            player.vel_y = -8
-                            player.jumping = True
-                            sounds["powerup"].play()
-                        elif powerup.type == "fuel":
-                            # Add fuel
-                            player.add_fuel(30)
-                            sounds["powerup"].play()
-                        elif powerup.type == "coin":
-                            # Add score - bonus points if the coin was floating (required jumping)
-                            bonus = 100
-                            if powerup.floating:
-                                bonus = 250  # More points for floating coins
-                            player.add_score(bonus)
-                            sounds["powerup"].play()
-                        
-                        powerup.active = False
+        # Check powerup collisions
+        for powerup, players in self.collisions(self.powerups):
+            for player in players:
+                if powerup.active and PICKUPS[powerup.type].collect(player, powerup.floating):
+                    powerup.active = False
         
         # Increase score based on distance traveled
         for player in self.players:
@@ -909,105 +959,143 @@ class Game:
             
             # Consume fuel continuously
             player.fuel -= 0.05  # Constant fuel consumption
+        
+        if self.game_over:
+            self.stop_engines()
+    
+    # Silence the rovers' engine loops, whose mixer channels outlive the
+    # game (call when it ends or is replaced)
+    def stop_engines(self):
+        for player in self.players:
+            player.engine_audio.stop()
+    
+    # Move coins within MAGNET_RADIUS of a rover with a magnet running
+    # towards it
+    def attract_coins(self):
+        coins = self.powerups
+        coin = coins.kind_codes["coin"]
+        moved = False
+        for player in self.players:
+            if not player.magnet_active:
+                continue
+            center_x = player.x + player.width / 2
+            center_y = player.y + player.height / 2
+            rows = coins.in_x_range(center_x - MAGNET_RADIUS, center_x + MAGNET_RADIUS)
+            rows = rows[coins.kind[rows] == coin]
+            dx = center_x - (coins.x[rows] + coins.width[rows] / 2)
+            dy = center_y - (coins.y[rows] + coins.height[rows] / 2)
+            distance = np.hypot(dx, dy)
+            near = (distance > 0) & (distance < MAGNET_RADIUS)
+            if not near.any():
+                continue
+            rows, dx, dy, distance = rows[near], dx[near], dy[near], distance[near]
+            step = np.minimum(distance, MAGNET_PULL) / distance
+            coins.x[rows] += dx * step
+            coins.y[rows] += dy * step
+            moved = True
+        if moved:
+            coins.resort()  # The store keeps coins sorted by x
+    
+    # Entities touching a rover, as (entity, players touching it) pairs in
+    # the order the entities were added. Each rover's rect is tested in one
+    # collidelistall() call: against every entity while there are only a
+    # few (the usual case), otherwise against the ones level with the rover
+    # (see EntityStore.in_x_range), which costs a few NumPy calls up front
+    # but does not grow with the number of entities.
+    def collisions(self, entities):
+        hits = {}
+        if entities.count <= SMALL_STORE:
+            rects = entities.rects()
+            for player in self.players:
+                rows = pygame.Rect(player.x, player.y, player.width, player.height).collidelistall(rects)
+                if not rows:  # Nearly every step
+                    continue
+                active = entities.active
+                for row in rows:
+                    if active[row]:
+                        hits.setdefault(row, []).append(player)
+        else:
+            for player in self.players:
+                player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
+                # A pixel of slack either side, as Rect truncates coordinates
+                rows = entities.in_x_range(player.x - 1, player.x + player.width + 1)
+                if not len(rows):
+                    continue
+                for i in player_rect.collidelistall(entities.rects(rows)):
+                    hits.setdefault(int(rows[i]), []).append(player)
+        if not hits:
+            return []
+        return [(entities[row], players) for row, players in sorted(hits.items())]
     
     def generate_path_coins(self):
         # Generate a path of coins for the player to follow
-        x_start = SCREEN_WIDTH + 50
-        
-        # Choose a pattern for the path
-        pattern_type = random.choice(["straight", "zigzag", "curve", "tunnel"])
-        
-        if pattern_type == "straight":
-            # Simple straight line of coins - all floating to require jumps
-            y = int(self.terrain.ground_height) - 80  # Higher off the ground
-            for i in range(8):
-                coin_x = x_start + i * 40
-                self.powerups.append(PowerUp(coin_x, y, "coin", True))  # Force floating
-        
-        elif pattern_type == "zigzag":
-            # Zigzag pattern of coins - all floating
-            y = int(self.terrain.ground_height) - 80
-            for i in range(8):
-                coin_x = x_start + i * 40
-                offset = 30 if i % 2 == 0 else -30
-                self.powerups.append(PowerUp(coin_x, y + offset, "coin", True))  # Force floating
-        
-        elif pattern_type == "curve":
-            # Curved path of coins - all floating
-            for i in range(8):
-                coin_x = x_start + i * 40
-                # Sine wave pattern
-                offset = int(math.sin(i * 0.5) * 50)
-                coin_y = int(self.terrain.ground_height) - 80 + offset
-                self.powerups.append(PowerUp(coin_x, coin_y, "coin", True))  # Force floating
-        
-        elif pattern_type == "tunnel":
-            # Tunnel of coins with obstacles in between - all floating
-            y = int(self.terrain.ground_height) - 80
-            for i in range(8):
-                coin_x = x_start + i * 60
-                
-                # Add coins at top and bottom of "tunnel"
-                self.powerups.append(PowerUp(coin_x, y - 60, "coin", True))  # Force floating
-                self.powerups.append(PowerUp(coin_x, y, "coin", True))  # Force floating
-                
-                # Add obstacle in middle occasionally
-                if i > 0 and i < 7 and i % 2 == 1:
-                    self.hazards.append(Hazard(coin_x, y - 30, "laser"))
-    
-    def draw(self, surface):
+        x_start = self.camera_x + SCREEN_WIDTH + 50
+        self.spawn_formation(random.choice(assets.get("formations")["path"]), x_start)
+    
+    # Add a coin formation (see formations.py) starting at world x, with
+    # one terrain lookup and one bulk insert per entity type. Formation
+    # coins all float, to require jumps.
+    def spawn_formation(self, formation, x):
+        lift = random.randint(*formation.lift) if formation.lift else 0
+        xs = x + formation.dx
+        ground = np.floor(self.terrain.heights_at_world(xs)) - lift
+        
+        points = formation.coin_points
+        self.powerups.extend(xs[points], ground[points] + formation.coin_dy, 20, 20,
+                             "coin", "coin_floating", floating=True)
+        for hazard_type, (points, dy) in formation.hazards.items():
+            width, height = HAZARD_SIZES[hazard_type]
+            self.hazards.extend(xs[points], ground[points] + dy, width, height, hazard_type)
+    
+    # Draw the game `alpha` of the way from the previous simulation step to
+    # the current one. Returns the screen rects that changed since the last
+    # frame drawn, or None if the whole screen did (for
+    # DirtyRectDisplay.update).
+    def draw(self, surface, alpha=1.0):
+        if self.game_over:
+            # Nothing is moving
+            alpha = 1.0
+        # The camera, alpha of the way from its previous position
+        shift = (1 - alpha) * (self.camera_x - self.previous_camera_x)
+        camera_x = self.camera_x - shift
+        
         # Draw background
-        surface.blit(background_img, (0, 0))
+        surface.blit(assets.get("background_img"), (0, 0))
         
         # Draw terrain
-        self.terrain.draw(surface)
-        
-        # Draw hazards
-        for hazard in self.hazards:
-            hazard.draw(surface)
+        if shift:
+            dirty = self.terrain.draw(surface, shift)
+        else:
+            dirty = self.terrain.draw(surface)
         
-        # Draw powerups
-        for powerup in self.powerups:
-            powerup.draw(surface)
+        # Draw the hazards, then powerups, on screen from the sprite atlas in
+        # one batch
+        atlas = assets.get("entity_atlas")
+        dirty += surface.blits([atlas.blit_args(sprite, x, y)
+                                for entities in (self.hazards, self.powerups)
+                                for sprite, x, y in entities.sprite_positions(camera_x - SPRITE_MARGIN,
+                                                                              camera_x + SCREEN_WIDTH + SPRITE_MARGIN,
+                                                                              camera_x)])
         
         # Draw players
         for player in self.players:
-            player.draw(surface)
+            dirty += player.draw(surface, alpha, self.camera_x, self.previous_camera_x)
         
         # Draw ghost if playing
         if self.playing_ghost and self.ghost_position:
             ghost_x, ghost_y = self.ghost_position
+            ghost_x -= self.camera_x
+            if self.previous_ghost_position:
+                previous_x, previous_y = self.previous_ghost_position
+                previous_x -= self.previous_camera_x
+                ghost_x = previous_x + (ghost_x - previous_x) * alpha
+                ghost_y = previous_y + (ghost_y - previous_y) * alpha
             # Draw a semi-transparent version of the rover for the ghost
-            ghost_rover = rover_img.copy()
-            ghost_rover.set_alpha(128)  # Semi-transparent
-            surface.blit(ghost_rover, (ghost_x, ghost_y))
+            dirty.append(surface.blit(rover_variants.get("default", 128), (ghost_x, ghost_y)))
         
         # Draw UI
-        font = pygame.font.Font(None, 36)
-        
-        # Draw player stats
-        for i, player in enumerate(self.players):
-            # Draw score
-            score_text = font.render(f"P{i+1} Score: {int(player.score)}", True, WHITE)
-            surface.blit(score_text, (10, 10 + i * 100))
-            
-            # Draw health bar
-            health_text = font.render(f"Health:", True, WHITE)
-            surface.blit(health_text, (10, 50 + i * 100))
-            pygame.draw.rect(surface, RED, (100, 55 + i * 100, 100, 15))
-            pygame.draw.rect(surface, GREEN, (100, 55 + i * 100, player.health, 15))
-            
-            # Draw fuel bar
-            fuel_text = font.render(f"Fuel:", True, WHITE)
-            surface.blit(fuel_text, (10, 80 + i * 100))
-            pygame.draw.rect(surface, (100, 100, 100), (100, 85 + i * 100, 100, 15))
-            fuel_color = (0, 255, 255) if player.fuel > 30 else (255, 165, 0) if player.fuel > 10 else RED
-            pygame.draw.rect(surface, fuel_color, (100, 85 + i * 100, player.fuel, 15))
-        
-        # Draw high score
-        if hasattr(self, 'high_score'):
-            high_score_text = font.render(f"High Score: {self.high_score}", True, YELLOW)
-            surface.blit(high_score_text, (SCREEN_WIDTH - 250, 10))
+        # Player stats and high score come from the cached HUD layer
+        dirty += self.hud.draw(surface, self.players, getattr(self, 'high_score', None))
         
         if self.game_over:
             # Semi-transparent overlay
@@ -1016,22 +1104,29 @@ class Game:
             surface.blit(overlay, (0, 0))
             
             # Game over text
-            game_over_text = font.render("GAME OVER - OUT OF FUEL", True, RED)
+            game_over_text = text_cache.render("GAME OVER - OUT OF FUEL", RED, 36)
             surface.blit(game_over_text, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT // 2 - 50))
             
             # Show final score
             if len(self.players) == 1:
                 final_score = self.players[0].score
-                score_text = font.render(f"Final Score: {int(final_score)}", True, WHITE)
+                score_text = text_cache.render(f"Final Score: {int(final_score)}", WHITE, 36)
                 surface.blit(score_text, (SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2))
             
             # Restart instructions
-            restart_text = font.render("Press ENTER to restart", True, WHITE)
+            restart_text = text_cache.render("Press ENTER to restart", WHITE, 36)
             surface.blit(restart_text, (SCREEN_WIDTH // 2 - 140, SCREEN_HEIGHT // 2 + 50))
             
             # Quit instructions
-            quit_text = font.render("Press Q to quit", True, WHITE)
+            quit_text = text_cache.render("Press Q to quit", WHITE, 36)
             surface.blit(quit_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 90))
+        
+        # The first frame and the frame the game-over screen appears redraw
+        # everything; after that the game-over screen stays still
+        if self.game_over != self.shown_game_over:
+            self.shown_game_over = self.game_over
+            return None
+        return [] if self.game_over else dirty
 
 # Main menu
 def main_menu():
@@ -1039,44 +1134,67 @@ def main_menu():
     selected = 0
     options = ["Single Player", "Two Players", "Time Trial", "Quit"]
     
-    # Play background music
-    try:
-        sounds["background_music"].play(-1)  # Loop indefinitely
-    except:
-        pass
+    # Build the remaining assets in the background while the menu is showing
+    assets.preload()
+    
+    # Stream background music
+    start_music()
+    
+    # The menu is only redrawn when something changes: the whole menu on
+    # the first frame (or when the window needs repainting), after that
+    # just the options, when the selection moves. In between, the loop
+    # sleeps in pygame.event.wait() instead of spinning at the frame rate.
+    redraw = True
+    dirty = None
     
     while menu:
-        screen.fill(BLACK)
-        
-        # Draw background
-        screen.blit(background_img, (0, 0))
-        
-        # Draw title
-        font_title = pygame.font.Font(None, 72)
-        title_text = font_title.render("LUNAR ROVER RACE", True, WHITE)
-        screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 100))
-        
-        # Draw menu options
-        font_menu = pygame.font.Font(None, 48)
-        for i, option in enumerate(options):
-            color = YELLOW if i == selected else WHITE
-            text = font_menu.render(option, True, color)
-            screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 250 + i * 60))
-        
-        pygame.display.update()
-        
-        # Handle events
-        for event in pygame.event.get():
+        if redraw:
+            screen.fill(BLACK)
+            
+            # Draw background
+            screen.blit(assets.get("background_img"), (0, 0))
+            
+            # Draw title
+            title_text = text_cache.render("LUNAR ROVER RACE", WHITE, 72)
+            screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 100))
+            
+            # Draw menu options
+            option_rects = []
+            for i, option in enumerate(options):
+                color = YELLOW if i == selected else WHITE
+                text = text_cache.render(option, color, 48)
+                option_rects.append(screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 250 + i * 60)))
+            
+            display.update(dirty)
+            redraw = False
+        
+        # Handle events, waiting for the next one (or the idle timeout)
+        event = pygame.event.wait(MENU_IDLE_MS)
+        events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+        exposed = False  # Whole window to repaint, whatever else happens
+        for event in events:
             if event.type == pygame.QUIT:
+                stop_music()
                 pygame.quit()
                 return None
             
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                redraw = True
+                exposed = True
+                dirty = None
+            
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
                     selected = (selected - 1) % len(options)
+                    redraw = True
+                    if not exposed:
+                        dirty = option_rects
                     sounds["jump"].play()
                 elif event.key == pygame.K_DOWN:
                     selected = (selected + 1) % len(options)
+                    redraw = True
+                    if not exposed:
+                        dirty = option_rects
                     sounds["jump"].play()
                 elif event.key == pygame.K_RETURN:
                     sounds["powerup"].play()
@@ -1085,24 +1203,40 @@ def main_menu():
                     elif selected == 1:  # Two Players
                         return Game(2)
                     elif selected == 2:  # Time Trial
-                        game = Game(1)
+                        # Race the ghost saved last time, on its course, if
+                        # there is one
+                        ghost = load_ghost()
+                        if ghost is not None:
+                            game = Game(1, seed=ghost.seed)
+                            game.playing_ghost = True
+                            game.ghost = ghost
+                        else:
+                            game = Game(1)
                         game.recording_ghost = True
                         return game
                     elif selected == 3:  # Quit
+                        stop_music()
                         pygame.quit()
                         return None
-        
-        clock.tick(FPS)
 
 # Main game loop
 def main():
+    init_display()
     running = True
     game = main_menu()
     
     if game is None:
         return
     
+    # The game advances in fixed steps of 1/FPS seconds whatever the frame
+    # rate; frames drawn between two steps are interpolated
+    timestep = FixedTimestep(1000 / FPS, MAX_CATCH_UP_STEPS)
+    clock.tick()
+    
     while running:
+        # Cap the frame rate, and find out how long the last frame took
+        elapsed = clock.tick(RENDER_FPS)
+        
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1114,11 +1248,14 @@ def main():
                     game.save_high_score()
                     
                     # Restart game
+                    game.stop_engines()
                     if game.recording_ghost:
-                        # Start time trial with ghost
-                        new_game = Game(1)
+                        # Start time trial with ghost on the same course,
+                        # keeping the ghost for next time
+                        ghost = game.save_ghost()
+                        new_game = Game(1, seed=game.terrain.seed)
                         new_game.playing_ghost = True
-                        new_game.ghost_data = game.ghost_data
+                        new_game.ghost = ghost
                         game = new_game
                     else:
                         # Normal restart
@@ -1128,23 +1265,84 @@ def main():
                     # Quit game
                     running = False
         
-        # Update game state
-        game.update()
+        # Update game state, as many steps as the time since the last frame
+        # calls for
+        for _ in range(timestep.advance(elapsed)):
+            game.update()
         
         # Draw everything
-        game.draw(screen)
+        dirty = game.draw(screen, timestep.alpha)
         
         # Update display
-        pygame.display.update()
-        
-        # Cap the frame rate
-        clock.tick(FPS)
+        display.update(dirty)
     
     # Save high score before quitting
     if game.game_over:
         game.save_high_score()
     
+    # Keep the time trial's ghost too, however it was left
+    if game.recording_ghost and len(game.ghost_recorder):
+        game.save_ghost()
+    
+    game.stop_engines()
+    stop_music()
+    pygame.quit()
+
+# Input for headless runs: drive forward, jumping now and then, with an
+# occasional stop and reverse (both players use the same script)
+HEADLESS_SCRIPT = [
+    (120, [pygame.K_RIGHT, pygame.K_d]),
+    (15, [pygame.K_RIGHT, pygame.K_UP, pygame.K_d, pygame.K_w]),
+    (60, [pygame.K_RIGHT, pygame.K_d]),
+    (45, [pygame.K_LEFT, pygame.K_a]),
+    (10, [pygame.K_UP, pygame.K_w]),
+    (40, []),
+]
+
+# Run the simulation without a window, audio or real-time clock, as fast as
+# it will go, restarting whenever a game ends. Reports ticks per second.
+def run_headless(steps, num_players=1, seed=None, script=None):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.display.init()
+    assets.register("sounds", silent_sound_effects)
+    if seed is not None:
+        random.seed(seed)  # Spawns too, not just the terrain
+    
+    keys = ScriptedInput.load(script) if script else ScriptedInput(HEADLESS_SCRIPT)
+    game = Game(num_players, seed)
+    game.input = keys
+    games = 1
+    scores = []
+    
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.update()
+        if game.game_over:
+            scores.append(int(game.players[0].score))
+            game = Game(num_players, seed)
+            game.input = keys
+            games += 1
+    elapsed = time.perf_counter() - start
+    
+    print(f"{steps} steps in {elapsed:.2f}s: {steps / elapsed:.0f} ticks/s "
+          f"({steps / elapsed / FPS:.1f}x real time), {games} games, "
+          f"finished game scores: {scores}")
     pygame.quit()
+    return steps / elapsed
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Lunar Rover Race")
+    parser.add_argument("--headless", action="store_true",
+                        default=os.environ.get("LUNAR_ROVER_HEADLESS") == "1",
+                        help="simulate without a window as fast as possible (also LUNAR_ROVER_HEADLESS=1)")
+    parser.add_argument("--steps", type=int, default=36000, help="simulation steps to run headless")
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1)
+    parser.add_argument("--seed", type=int, help="course and spawn seed for headless runs")
+    parser.add_argument("--script", help="JSON input script for headless runs")
+    args = parser.parse_args()
+    
+    if args.headless:
+        run_headless(args.steps, args.players, args.seed, args.script)
+    else:
+        main()
@@ -0,0 +1,112 @@
+import random
+import threading
+from collections import deque
+
+import numpy as np
+import pygame
+
+import sound_synth
+
+# Streaming background music.
+# Instead of synthesizing a whole loop up front, the music is rendered in
+# short chunks on a worker thread and fed to a reserved mixer channel with
+# Channel.queue(), so only a few chunks are ever held in memory and the
+# first note plays almost immediately.
+
+# Endless sequence of chords (tuples of frequencies). The progression is
+# played once as written, then varied at random: chords are picked from the
+# progression, never the same one twice in a row, and occasionally moved an
+# octave up or down.
+def chord_sequence(progression, rng=None):
+    if rng is None:
+        rng = random.Random()
+    for chord in progression:
+        yield tuple(chord)
+
+    previous = tuple(progression[-1])
+    while True:
+        chord = tuple(rng.choice(progression))
+        if len(progression) > 1 and chord == previous:
+            continue
+        previous = chord
+        shift = rng.choice((1, 1, 1, 0.5, 2))
+        yield tuple(freq * shift for freq in chord)
+
+# Yield int16 chunks of `chunk_seconds` each. Every chord in `chords` lasts
+# `chord_seconds` and is rendered by render(chord, t, length, sample_rate),
+# where t holds the sample positions within the chord and length is the
+# chord's total number of samples, so waveforms and envelopes stay
+# continuous across chunk boundaries.
+def chord_chunks(chords, render, chord_seconds, sample_rate, chunk_seconds=0.5, max_sample=sound_synth.MAX_SAMPLE):
+    chunk_length = int(chunk_seconds * sample_rate)
+    chord_length = int(chord_seconds * sample_rate)
+    chord = next(chords)
+    position = 0
+
+    while True:
+        pieces = []
+        needed = chunk_length
+        while needed:
+            take = min(needed, chord_length - position)
+            t = np.arange(position, position + take, dtype=np.float64)
+            pieces.append(render(chord, t, chord_length, sample_rate))
+            position += take
+            needed -= take
+            if position == chord_length:
+                chord = next(chords)
+                position = 0
+        yield sound_synth.to_int16(np.concatenate(pieces), max_sample)
+
+class MusicStream:
+    def __init__(self, chunks, ahead=2, volume=1.0):
+        self.chunks = chunks
+        self.ahead = ahead  # Chunks synthesized ahead of the one queued
+        self.volume = volume
+        self.channel = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.channel is None:
+            # Reserved so sound effects never steal the music channel
+            self.channel = sound_synth.reserve_channel("music")
+        self.channel.set_volume(self.volume)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="music", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.channel is not None:
+            try:
+                self.channel.stop()
+            except pygame.error:
+                pass
+
+    def _run(self):
+        pending = deque()
+        try:
+            while not self._stop.is_set():
+                # Hand chunks to the mixer as soon as there is room, so the
+                # first one starts playing right after it is synthesized
+                if pending and not self.channel.get_busy():
+                    self.channel.play(pending.popleft())
+                elif pending and self.channel.get_queue() is None:
+                    self.channel.queue(pending.popleft())
+                elif len(pending) < self.ahead:
+                    # Keep a small number of chunks ready; memory stays
+                    # bounded to the playing chunk, the queued one and
+                    # `ahead` more
+                    pending.append(sound_synth.make_sound(next(self.chunks)))
+                else:
+                    # The channel holds one queued chunk; check back well
+                    # before the playing chunk runs out
+                    self._stop.wait(pending[0].get_length() / 4)
+        except pygame.error:
+            # The mixer was shut down underneath us (game quitting)
+            pass
@@ -0,0 +1,48 @@
+import json
+
+import pygame
+
+# Canned keyboard input, for running the game without anyone at the keys
+# (soak tests, balance checks). A script is a list of (steps, keys) pairs:
+# hold `keys` for `steps` simulation steps, then move on to the next pair.
+
+# Stand-in for what pygame.key.get_pressed() returns
+class KeyState:
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+class ScriptedInput:
+    def __init__(self, script, loop=True):
+        self.segments = [(steps, KeyState(keys)) for steps, keys in script if steps > 0]
+        if not self.segments:
+            raise ValueError("input script has no steps")
+        self.loop = loop  # Start over at the end, otherwise release all keys
+        self.index = 0
+        self.remaining = self.segments[0][0]
+        self.released = KeyState()
+
+    # Keys held for the next step; called once per step like get_pressed()
+    def __call__(self):
+        if not self.remaining:
+            if self.index == len(self.segments):
+                # A script that does not loop has finished
+                return self.released
+            self.index += 1
+            if self.index == len(self.segments):
+                if not self.loop:
+                    return self.released
+                self.index = 0
+            self.remaining = self.segments[self.index][0]
+        self.remaining -= 1
+        return self.segments[self.index][1]
+
+    # Read a script from a JSON file of [steps, ["K_RIGHT", "K_UP", ...]]
+    # pairs, with keys named after the pygame constants
+    @classmethod
+    def load(cls, path, loop=True):
+        with open(path) as file:
+            script = json.load(file)
+        return cls([(steps, [getattr(pygame, name) for name in keys]) for steps, keys in script], loop)
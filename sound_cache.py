@@ -0,0 +1,126 @@
+import hashlib
+import inspect
+import os
+import wave
+
+import numpy as np
+
+# On-disk cache for synthesized sound buffers.
+# Each buffer is stored as a mono 16-bit WAV file named after a hash of the
+# sound name, its synthesis parameters, the sample rate, the source of the
+# routine that builds it and CACHE_VERSION. A warm start memory-maps the
+# file instead of running the synthesis again.
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "sounds", "cache")
+CACHE_VERSION = 1  # Bump when code shared by the builders (sound_synth) changes its output
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+WAV_HEADER_BYTES = 44
+
+# What a builder does, for the cache key: its source code, so editing a
+# synthesis routine rebuilds its sounds, or its bytecode and constants when
+# the source is not available
+def builder_source(build):
+    if build is None:
+        return None
+    try:
+        return inspect.getsource(build)
+    except (OSError, TypeError):
+        code = getattr(build, "__code__", None)
+        if code is None:
+            return getattr(build, "__qualname__", repr(type(build)))
+        return repr((code.co_code, code.co_consts))
+
+class SoundCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name, params, sample_rate, build=None):
+        text = repr((CACHE_VERSION, name, tuple(params), sample_rate, builder_source(build)))
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def path_for(self, name, params, sample_rate, build=None):
+        return os.path.join(self.directory, f"{name}-{self.key(name, params, sample_rate, build)}.wav")
+
+    # Return the int16 samples for `name`, calling build(sample_rate, *params)
+    # only when there is no valid cached copy
+    def load(self, name, build, params, sample_rate):
+        path = self.path_for(name, params, sample_rate, build)
+        pcm = self._read(path, sample_rate)
+        if pcm is not None:
+            self.hits += 1
+            return pcm
+
+        self.misses += 1
+        pcm = np.ascontiguousarray(build(sample_rate, *params), dtype="<i2")
+        self._write(path, pcm, sample_rate)
+        return pcm
+
+    def _read(self, path, sample_rate):
+        try:
+            with wave.open(path, "rb") as wav_file:
+                frames = wav_file.getnframes()
+                valid = (wav_file.getnchannels() == 1 and wav_file.getsampwidth() == 2
+                         and wav_file.getframerate() == sample_rate)
+            # Only files written by _write are trusted: anything with an
+            # unexpected format or length is treated as stale and rebuilt
+            if not valid or os.path.getsize(path) != WAV_HEADER_BYTES + frames * 2:
+                return None
+            pcm = np.memmap(path, dtype="<i2", mode="r", offset=WAV_HEADER_BYTES, shape=(frames,))
+            os.utime(path)  # Mark as recently used for eviction
+            return pcm
+        except (OSError, EOFError, wave.Error, ValueError):
+            return None
+
+    def _write(self, path, pcm, sample_rate):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a
+            # half-written entry behind
+            temp_path = path + ".tmp"
+            with wave.open(temp_path, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(sample_rate)
+                wav_file.writeframes(pcm.tobytes())
+            os.replace(temp_path, path)
+        except OSError:
+            return
+        self.evict(keep=path)
+
+    # Delete least recently used entries until the cache fits in max_bytes
+    def evict(self, keep=None):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        entries = []
+        total = 0
+        for name in names:
+            if not name.endswith(".wav"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+# Shared cache used by both game builds
+default_cache = SoundCache()
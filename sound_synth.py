@@ -0,0 +1,83 @@
+import numpy as np
+import pygame
+
+# Vectorized sound synthesis helpers shared by both game builds.
+# Every generator works on a whole array of sample indices at once, so a
+# multi-second buffer costs a handful of NumPy calls instead of one Python
+# loop iteration per sample.
+
+SAMPLE_RATE = 44100
+MAX_SAMPLE = 32767
+
+# Sample indices for a buffer of the given length in seconds
+def timeline(duration, sample_rate=SAMPLE_RATE):
+    return np.arange(int(duration * sample_rate), dtype=np.float64)
+
+# Basic waveforms in the range [-1, 1]. The frequency may be a scalar or an
+# array the same length as t, which gives pitch sweeps for free.
+def sine(frequency, t, sample_rate=SAMPLE_RATE):
+    return np.sin(2 * np.pi * frequency * t / sample_rate)
+
+def square(frequency, t, sample_rate=SAMPLE_RATE):
+    return np.where(sine(frequency, t, sample_rate) > 0, 1.0, -1.0)
+
+def sawtooth(frequency, t, sample_rate=SAMPLE_RATE):
+    period = sample_rate / frequency
+    return (t % int(period)) / period * 2 - 1
+
+def noise(length, rng=None):
+    if rng is None:
+        rng = np.random
+    return rng.uniform(-1, 1, length)
+
+# Sum of sines, one per frequency, each scaled by its amplitude
+def chord(frequencies, t, sample_rate=SAMPLE_RATE, amplitude=1.0):
+    wave = np.zeros(len(t))
+    for freq in frequencies:
+        wave += amplitude * sine(freq, t, sample_rate)
+    return wave
+
+# Linear fade in over `attack` samples and fade out over the last `release`
+# samples of a buffer with `length` samples. Pass the sample positions `n` to
+# get just a slice of the envelope (used when streaming in chunks).
+def fade_envelope(length, attack, release, n=None):
+    if n is None:
+        n = np.arange(length, dtype=np.float64)
+    envelope = np.ones(len(n))
+    if attack > 0:
+        envelope = np.minimum(envelope, n / attack)
+    if release > 0:
+        envelope = np.minimum(envelope, (length - n) / release)
+    return envelope
+
+# Amplitude modulation: scales the wave by `1 - depth + depth * sin(...)`,
+# which swings between 1 - 2 * depth (sine at -1) and 1 (sine at 1)
+def tremolo(wave, t, rate, depth, sample_rate=SAMPLE_RATE):
+    return wave * ((1 - depth) + depth * sine(rate, t, sample_rate))
+
+# Scale a [-1, 1] waveform to signed 16-bit PCM. Values are truncated
+# toward zero like int() and clipped so loud mixes cannot wrap around.
+def to_int16(wave, max_sample=MAX_SAMPLE):
+    pcm = np.trunc(wave * max_sample)
+    np.clip(pcm, -max_sample, max_sample, out=pcm)
+    return np.ascontiguousarray(pcm, dtype="<i2")
+
+# Hand an int16 buffer straight to the mixer
+def make_sound(pcm):
+    return pygame.mixer.Sound(buffer=pcm)
+
+# Hand out a mixer channel that Sound.play() will never pick, for long-lived
+# loops (music, engines) that must not be cut off by one-shot effects. The
+# same key always gets the same channel, so a restarted game reuses the
+# channels of the previous one instead of reserving more.
+_reserved_channels = {}
+
+def reserve_channel(key):
+    if key not in _reserved_channels:
+        _reserved_channels[key] = len(_reserved_channels)
+        count = len(_reserved_channels)
+        # Keep a few free channels for sound effects
+        if pygame.mixer.get_num_channels() < count + 4:
+            pygame.mixer.set_num_channels(count + 8)
+        pygame.mixer.set_reserved(count)
+    return pygame.mixer.Channel(_reserved_channels[key])
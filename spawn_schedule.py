@@ -0,0 +1,104 @@
+import heapq
+import itertools
+import random
+
+# Timed spawning for the game loop.
+# Spawns are events in a heap keyed by the simulation tick they are due at,
+# so a step only looks at the events that are due, however many are
+# waiting. Recurring rules put themselves back in the heap after each
+# firing; scripted waves are one-off events. Events due at the same tick
+# run in priority order (the order their rules were added, for rules).
+
+# Picks kinds at random in proportion to whole-number weights. The kinds
+# are laid out weight times each in a list, so a pick is one
+# random.choice() whatever the weights.
+class WeightedTable:
+    def __init__(self, weights):
+        self.choices = [kind for kind, weight in dict(weights).items() for _ in range(weight)]
+        if not self.choices:
+            raise ValueError("weighted table has nothing to choose from")
+
+    def choose(self):
+        return random.choice(self.choices)
+
+# A setting that changes over a run, for difficulty curves: `start` at tick
+# 0, moving in a straight line to `end` at tick `ticks` and staying there
+def ramp(start, end, ticks):
+    def value(tick):
+        return start + (end - start) * min(tick / ticks, 1.0)
+    return value
+
+# A setting's value at a tick; settings are plain numbers or functions of
+# the tick (like ramp())
+def value_at(setting, tick):
+    return setting(tick) if callable(setting) else setting
+
+# Something that spawns every `interval` ticks, with probability `chance`.
+# spawn() is called with a kind from `table` when there is one, otherwise
+# with no arguments.
+class SpawnRule:
+    def __init__(self, interval, spawn, chance=1.0, table=None):
+        self.interval = interval
+        self.spawn = spawn
+        self.chance = chance
+        self.table = table
+        self.enabled = True  # Disabled rules keep their place but spawn nothing
+        self.priority = 0  # Set by SpawnScheduler.add_rule()
+
+    def fire(self, tick):
+        if not self.enabled:
+            return
+        chance = value_at(self.chance, tick)
+        if chance < 1 and random.random() >= chance:
+            return
+        if self.table is not None:
+            self.spawn(self.table.choose())
+        else:
+            self.spawn()
+
+class SpawnScheduler:
+    def __init__(self):
+        self.tick = 0  # Simulation steps run
+        self.queue = []  # (due tick, priority, sequence, action, args)
+        self.sequence = itertools.count()  # Keeps equal keys first in, first out
+        self.rules = []
+
+    # Run action(*args) at the given tick
+    def at(self, tick, action, *args, priority=0):
+        heapq.heappush(self.queue, (tick, priority, next(self.sequence), action, args))
+
+    # Run action(*args) `delay` ticks from now
+    def after(self, delay, action, *args, priority=0):
+        self.at(self.tick + delay, action, *args, priority=priority)
+
+    def add_rule(self, rule):
+        self.rules.append(rule)
+        rule.priority = len(self.rules)
+        self._schedule_rule(rule)
+        return rule
+
+    # A scripted wave: (ticks from the start of the wave, kind) pairs, each
+    # passed to spawn() when it is due. Waves run before rules due at the
+    # same tick.
+    def add_wave(self, wave, spawn, delay=0):
+        for offset, kind in wave:
+            self.after(delay + offset, spawn, kind)
+
+    def _schedule_rule(self, rule):
+        interval = max(1, round(value_at(rule.interval, self.tick)))
+        self.after(interval, self._fire_rule, rule, priority=rule.priority)
+
+    def _fire_rule(self, rule):
+        rule.fire(self.tick)
+        self._schedule_rule(rule)
+
+    # Move on one tick and run everything that is now due
+    def advance(self):
+        self.tick += 1
+        queue = self.queue
+        while queue and queue[0][0] <= self.tick:
+            _, _, _, action, args = heapq.heappop(queue)
+            action(*args)
+
+    def __len__(self):
+        return len(self.queue)
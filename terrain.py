@@ -0,0 +1,302 @@
+import math
+import random
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+GRAY = (100, 100, 100)
+CHUNK_COLORKEY = (255, 0, 255)  # Transparent sky above the ground in a chunk
+
+# Fixed-capacity ring buffer of terrain heights.
+# Segments are appended at the back and dropped from the front without
+# shifting or reallocating anything.
+class HeightRing:
+    def __init__(self, capacity):
+        self.heights = np.zeros(capacity)
+        self.capacity = capacity
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not -self.count <= i < self.count:
+            raise IndexError("height ring index out of range")
+        return float(self.heights[(self.start + i % self.count) % self.capacity])
+
+    def append(self, height):
+        if self.count == self.capacity:
+            raise OverflowError("height ring is full")
+        self.heights[(self.start + self.count) % self.capacity] = height
+        self.count += 1
+
+    # Heights at an array of logical indices (0 is the oldest segment)
+    def take(self, indices):
+        return self.heights[(self.start + np.asarray(indices)) % self.capacity]
+
+    def popleft(self):
+        if not self.count:
+            raise IndexError("pop from an empty height ring")
+        height = float(self.heights[self.start])
+        self.start = (self.start + 1) % self.capacity
+        self.count -= 1
+        return height
+
+# Deterministic lunar course.
+# Segment heights are a pure function of (seed, chunk index): every chunk
+# boundary gets an anchor height from its own seeded generator, and the
+# segments in between are a random walk with craters and hills, bent so it
+# lands exactly on the next anchor. Any stretch of the course can therefore
+# be generated on its own, in any order, and always comes out the same.
+class TerrainCourse:
+    def __init__(self, seed, ground_height, segment_width=20, chunk_segments=20, cache_size=16):
+        self.seed = seed
+        self.ground_height = ground_height
+        self.segment_width = segment_width
+        self.chunk_segments = chunk_segments
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # Recently used chunks, oldest first
+
+    def _rng(self, k, stream):
+        # Zigzag-encode k so negative chunk indices get their own seeds
+        index = 2 * k if k >= 0 else -2 * k - 1
+        return np.random.default_rng([self.seed, index, stream])
+
+    # Height of the boundary segment that starts chunk k
+    def anchor(self, k):
+        return self.ground_height + self._rng(k, 0).integers(-30, 31)
+
+    def _generate_chunk(self, k):
+        rng = self._rng(k, 1)
+        count = self.chunk_segments
+        steps = rng.integers(-10, 11, count).astype(np.float64)
+        # Occasionally add craters or hills
+        crater = rng.random(count) < 0.1
+        hill = ~crater & (rng.random(count) < 0.1)
+        steps[crater] += rng.integers(20, 41, crater.sum())
+        steps[hill] -= rng.integers(20, 41, hill.sum())
+
+        start = self.anchor(k)
+        walk = start + np.concatenate(([0.0], np.cumsum(steps)))
+        # Bend the walk so it ends on the next chunk's anchor
+        walk += (self.anchor(k + 1) - walk[-1]) * np.linspace(0, 1, count + 1)
+        # Keep heights within reasonable bounds
+        np.clip(walk, self.ground_height - 50, self.ground_height + 50, out=walk)
+        return walk[:-1]
+
+    # Heights of the chunk_segments segments in chunk k
+    def chunk(self, k):
+        heights = self._cache.get(k)
+        if heights is None:
+            heights = self._generate_chunk(k)
+            self._cache[k] = heights
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(k)
+        return heights
+
+    # Height of the segment with absolute index n (world x = n * segment_width)
+    def segment_height(self, n):
+        return float(self.chunk(n // self.chunk_segments)[n % self.chunk_segments])
+
+    # Heights of segments first .. first + count - 1
+    def segment_heights(self, first, count):
+        first_chunk = first // self.chunk_segments
+        last_chunk = (first + count - 1) // self.chunk_segments
+        heights = np.concatenate([self.chunk(k) for k in range(first_chunk, last_chunk + 1)])
+        offset = first - first_chunk * self.chunk_segments
+        return heights[offset:offset + count]
+
+    # Surface heights at any world x positions, interpolated between segments
+    def heights_at(self, world_xs):
+        position = np.asarray(world_xs, dtype=np.float64) / self.segment_width
+        index = np.floor(position).astype(np.intp)
+        first = int(index.min())
+        heights = self.segment_heights(first, int(index.max()) - first + 2)
+        y1 = heights[index - first]
+        y2 = heights[index - first + 1]
+        return y1 + (position - index) * (y2 - y1)
+
+# Visible window onto a TerrainCourse, scrolled across the screen
+class TerrainGenerator:
+    def __init__(self, screen_width, screen_height, seed=None):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.ground_height = screen_height * 0.7
+        self.segment_width = 20
+        # A new course every game unless a seed is given (e.g. to race a
+        # ghost on the same course)
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.course = TerrainCourse(seed, self.ground_height, self.segment_width)
+        # Segment i sits at screen x = scroll_x + i * segment_width, so
+        # scrolling only moves scroll_x
+        self.scroll_x = 0.0
+        # Segments span from one width off the left edge to 500 pixels past
+        # the right edge, plus room for the one appended before scrolling
+        self.heights = HeightRing((screen_width + 500) // self.segment_width + 4)
+        # Absolute index of the oldest segment still in the ring
+        self.first_segment = 0
+        # Ground is rasterized once into chunks of this many segments,
+        # keyed by chunk number. A chunk is complete before it scrolls into
+        # view as long as it is narrower than the 500 pixel lookahead.
+        self.chunk_segments = 20
+        self.chunks = {}
+        self.generate_initial_terrain()
+
+    @property
+    def segments(self):
+        # (x, height) pairs, as the terrain used to be stored
+        return [(self.scroll_x + i * self.segment_width, self.heights[i]) for i in range(len(self.heights))]
+
+    # World x of the left edge of the screen
+    @property
+    def world_x(self):
+        return self.first_segment * self.segment_width - self.scroll_x
+
+    def generate_initial_terrain(self):
+        # Generate terrain segments that extend beyond the screen
+        count = len(range(0, self.screen_width + 500, self.segment_width))
+        for height in self.course.segment_heights(0, count):
+            self.heights.append(height)
+
+        for k in range((len(self.heights) - 1) // self.chunk_segments):
+            self.build_chunk(k)
+
+    def update(self, scroll_speed):
+        # Remove segments that have scrolled off screen
+        while len(self.heights) and self.scroll_x < -self.segment_width:
+            self.heights.popleft()
+            self.scroll_x += self.segment_width
+            self.first_segment += 1
+
+        # Drop chunks that have scrolled off the left edge
+        for k in list(self.chunks):
+            if (k + 1) * self.chunk_segments < self.first_segment:
+                del self.chunks[k]
+
+        # Add new segments at the right edge
+        last_x = self.scroll_x + (len(self.heights) - 1) * self.segment_width
+
+        if last_x < self.screen_width + 500:
+            self.heights.append(self.course.segment_height(self.first_segment + len(self.heights)))
+
+            # Rasterize the chunk this segment completes
+            last_segment = self.first_segment + len(self.heights) - 1
+            if last_segment % self.chunk_segments == 0:
+                self.build_chunk(last_segment // self.chunk_segments - 1)
+
+        # Scroll all segments
+        self.scroll_x -= scroll_speed
+
+    # Heights of the segments in chunk k (including the first segment of
+    # the next chunk, which closes the polygon) and their screen x positions
+    def chunk_outline(self, k):
+        first = max(k * self.chunk_segments - self.first_segment, 0)
+        last = min((k + 1) * self.chunk_segments - self.first_segment, len(self.heights) - 1)
+        indices = np.arange(first, last + 1)
+        return self.scroll_x + indices * self.segment_width, self.heights.take(indices)
+
+    def build_chunk(self, k):
+        xs, heights = self.chunk_outline(k)
+        top = int(heights.min())
+        left = xs[0]
+        width = self.chunk_segments * self.segment_width
+
+        # RLE colorkey blits skip the sky above the ground line and copy the
+        # solid rows below it in runs
+        chunk = pygame.Surface((width, self.screen_height - top))
+        chunk.fill(CHUNK_COLORKEY)
+        points = [(x - left, y - top) for x, y in zip(xs, heights)]
+        points += [(width, self.screen_height - top), (0, self.screen_height - top)]
+        pygame.draw.polygon(chunk, GRAY, points)
+        chunk.set_colorkey(CHUNK_COLORKEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+
+        self.chunks[k] = (chunk, top)
+
+    # Draw the ground `shift` pixels right of where it currently is (for
+    # drawing between two updates). Returns the screen rects that were drawn.
+    def draw(self, surface, shift=0.0):
+        # Blit the cached chunks that overlap the screen
+        rects = []
+        chunk_width = self.chunk_segments * self.segment_width
+        # Screen x of the start of chunk 0
+        origin = self.scroll_x - self.first_segment * self.segment_width + shift
+        first_chunk = math.floor(-origin / chunk_width)
+        last_chunk = math.floor((self.screen_width - origin) / chunk_width)
+
+        for k in range(first_chunk, last_chunk + 1):
+            if k in self.chunks:
+                chunk, top = self.chunks[k]
+                rects.append(surface.blit(chunk, (math.floor(origin + k * chunk_width), top)))
+            else:
+                # Not rasterized yet (only happens if the lookahead is
+                # shorter than a chunk): draw what exists as one polygon
+                xs, heights = self.chunk_outline(k)
+                if len(xs) < 2:
+                    continue
+                xs = xs + shift
+                points = list(zip(xs, heights))
+                points += [(xs[-1], self.screen_height), (xs[0], self.screen_height)]
+                rects.append(pygame.draw.polygon(surface, GRAY, points))
+        return rects
+
+    def get_height_at(self, x):
+        # Segments are evenly spaced, so the one containing x can be found
+        # directly instead of scanning
+        i = int((x - self.scroll_x) // self.segment_width)
+        x1 = self.scroll_x + i * self.segment_width
+        # Guard against float rounding right at a segment boundary
+        if x < x1:
+            i -= 1
+            x1 -= self.segment_width
+        elif x >= x1 + self.segment_width:
+            i += 1
+            x1 += self.segment_width
+
+        if 0 <= i < len(self.heights) - 1:
+            # Linear interpolation
+            y1 = self.heights[i]
+            y2 = self.heights[i + 1]
+            ratio = (x - x1) / self.segment_width
+            return y1 + ratio * (y2 - y1)
+
+        # Default if x is off the generated terrain
+        return self.ground_height
+
+    # Vectorized get_height_at for many x positions at once. Returns the
+    # surface heights and slopes (change in height per pixel, positive going
+    # downhill on screen); positions off the generated terrain get
+    # ground_height and a slope of 0.
+    def surface_at(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        position = (xs - self.scroll_x) / self.segment_width
+        index = np.floor(position).astype(np.intp)
+        valid = (index >= 0) & (index < len(self.heights) - 1)
+        # Clamp so the lookups below stay in range; invalid entries are
+        # replaced afterwards
+        index = np.clip(index, 0, max(len(self.heights) - 2, 0))
+
+        y1 = self.heights.take(index)
+        y2 = self.heights.take(index + 1)
+        ratio = position - index
+        heights = np.where(valid, y1 + ratio * (y2 - y1), self.ground_height)
+        slopes = np.where(valid, (y2 - y1) / self.segment_width, 0.0)
+        return heights, slopes
+
+    def heights_at(self, xs):
+        return self.surface_at(xs)[0]
+
+    # get_height_at() and heights_at() for world x positions rather than
+    # screen positions
+    def height_at_world(self, x):
+        return self.get_height_at(x - self.world_x)
+
+    def heights_at_world(self, xs):
+        return self.heights_at(np.asarray(xs, dtype=np.float64) - self.world_x)
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects import Effect, EffectTimers
+
+class Target:
+    def __init__(self):
+        self.events = []
+
+def timers(**stacking):
+    effects = {name: Effect(duration, stacking.get(name, "refresh"),
+                            on_start=lambda target, name=name: target.events.append(("start", name)),
+                            on_end=lambda target, name=name: target.events.append(("end", name)))
+               for name, duration in (("boost", 180), ("shield", 300))}
+    return EffectTimers(Target(), effects)
+
+# Steps an effect stays active after starting, the way the countdowns the
+# timers replaced worked: set to the duration, counted down every step
+# and off once it reaches 0
+def countdown_steps(duration):
+    time = duration
+    steps = 0
+    while True:
+        steps += 1
+        time -= 1
+        if time <= 0:
+            return steps - 1
+
+def active_steps(effects, name):
+    steps = 0
+    while True:
+        effects.advance()
+        if not effects.active(name):
+            return steps
+        steps += 1
+
+def test_expiry_matches_the_old_countdowns():
+    for name, duration in (("boost", 180), ("shield", 300)):
+        effects = timers()
+        for _ in range(37):
+            effects.advance()
+        effects.start(name)
+        assert active_steps(effects, name) == countdown_steps(duration)
+        assert effects.target.events == [("start", name), ("end", name)]
+
+def test_refresh_restarts_the_duration():
+    effects = timers()
+    effects.start("boost")
+    for _ in range(100):
+        effects.advance()
+    effects.start("boost")
+    assert effects.elapsed("boost") == 0
+    assert effects.remaining("boost") == 180
+    # The first start's heap entry comes up at step 180 and is skipped
+    assert active_steps(effects, "boost") == countdown_steps(180)
+    assert effects.target.events == [("start", "boost"), ("end", "boost")]
+
+def test_extend_and_keep():
+    effects = timers(boost="extend", shield="keep")
+    effects.start("boost")
+    effects.start("shield")
+    for _ in range(50):
+        effects.advance()
+    effects.start("boost")
+    effects.start("shield")
+    assert effects.remaining("boost") == 2 * 180 - 50
+    assert effects.remaining("shield") == 300 - 50
+    assert effects.elapsed("shield") == 50
+    assert effects.target.events == [("start", "boost"), ("start", "shield")]
+
+def test_ending_early_calls_on_end_once():
+    effects = timers()
+    effects.start("shield")
+    effects.advance()
+    effects.end("shield")
+    effects.end("shield")
+    assert not effects.active("shield")
+    for _ in range(300):
+        effects.advance()
+    assert effects.target.events == [("start", "shield"), ("end", "shield")]
@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from entity_store import EntityStore
+
+KINDS = {"meteor": 20, "laser": 40}
+
+# The store's rows as plain lists, to check it against
+def shadow(store):
+    return [[entity.x, entity.y, entity.width, entity.height, entity.type, entity.active] for entity in store]
+
+def brute_in_x_range(rows, left, right):
+    return [i for i, (x, _, width, _, _, active) in enumerate(rows) if active and x < right and x + width > left]
+
+def check(store, rows, rng):
+    assert shadow(store) == rows
+    order, keys = store._order, store._keys
+    assert sorted(order.tolist()) == list(range(len(rows)))
+    assert np.all(np.diff(keys) >= 0)
+    assert keys.tolist() == [rows[i][0] for i in order.tolist()]
+    assert store.rects() == [tuple(row[:4]) for row in rows]
+    for _ in range(10):
+        left = rng.uniform(-100, 1100)
+        right = left + rng.uniform(0, 400)
+        assert store.in_x_range(left, right).tolist() == brute_in_x_range(rows, left, right)
+
+def test_random_operations_agree_with_brute_force():
+    rng = random.Random(5)
+    store = EntityStore(KINDS, capacity=4)
+    rows = []
+    camera = 0.0
+    for _ in range(2000):
+        operation = rng.random()
+        if operation < 0.35:
+            # Add a batch of one kind, sometimes on top of existing x values
+            kind = rng.choice(list(KINDS))
+            count = rng.randint(1, 6)
+            xs = [rng.choice([camera + rng.uniform(0, 1000), float(rng.randint(0, 5) * 100)])
+                  for _ in range(count)]
+            ys = [rng.uniform(0, 600) for _ in range(count)]
+            store.extend(xs, ys, KINDS[kind], 20, kind)
+            rows += [[x, y, float(KINDS[kind]), 20.0, kind, True] for x, y in zip(xs, ys)]
+        elif operation < 0.5 and rows:
+            # Move, resize or use up one entity
+            index = rng.randrange(len(rows))
+            entity = store[index]
+            change = rng.random()
+            if change < 0.4:
+                entity.x = rows[index][0] = camera + rng.uniform(-200, 1200)
+            elif change < 0.6:
+                entity.width = rows[index][2] = float(rng.randint(5, 80))
+            elif change < 0.7:
+                entity.y = rows[index][1] = rng.uniform(0, 600)
+            else:
+                entity.active = rows[index][5] = False
+        elif operation < 0.8:
+            # Scroll on and forget what went off the left
+            camera += rng.uniform(0, 60)
+            store.cull(camera)
+            kept = [row for row in rows if row[5] and row[0] + row[2] >= camera]
+            assert len(store) in (len(rows), len(kept))
+            if len(store) != len(rows):
+                rows = kept
+        elif operation < 0.97:
+            keep = [rng.random() < 0.7 for _ in rows]
+            store.compact(keep)
+            rows = [row for row, kept in zip(rows, keep) if kept]
+        else:
+            store.clear()
+            rows = []
+        check(store, rows, rng)
+
+def test_cull_keeps_entities_partly_on_screen():
+    store = EntityStore(KINDS)
+    store.extend([0.0, 50.0, 100.0], 0, 40, 20, "laser")
+    store.cull(60, slack=0)
+    assert store.x.tolist() == [50.0, 100.0]
+    assert store.in_x_range(60, 70).tolist() == [0]
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ghost import HEADER, GhostRecorder, load_ghost
+
+# A path with small steps, a few jumps too big for a delta byte and a
+# negative position
+PATH = [(100 + step * 5.25, 400 - step % 7) for step in range(50)] + [(3000.0, 120.5), (2990.0, -40.0), (10.0, 400.0)]
+
+def recorded(path=PATH):
+    recorder = GhostRecorder()
+    for x, y in path:
+        recorder.record(x, y)
+    return recorder
+
+def played(player):
+    positions = []
+    while (position := player.advance()) is not None:
+        positions.append(position)
+    return positions
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "ghost.dat")
+    recorder = recorded()
+    assert len(recorder.escapes) > 2  # The first step, and the jumps
+    recorder.save(path, seed=42)
+
+    ghost = load_ghost(path)
+    assert ghost.seed == 42
+    assert len(ghost) == len(PATH)
+    assert played(ghost) == [(round(x * 4) / 4, round(y * 4) / 4) for x, y in PATH]
+    ghost.rewind()
+    assert played(ghost) == played(recorder.player())
+
+def test_unusable_files_are_no_ghost(tmp_path):
+    path = str(tmp_path / "ghost.dat")
+    assert load_ghost(path) is None  # Missing
+
+    recorded().save(path)
+    with open(path, "rb") as file:
+        data = file.read()
+    def load(data):
+        with open(path, "wb") as file:
+            file.write(data)
+        return load_ghost(path)
+
+    assert load(data) is not None
+    assert load(data[:-1]) is None  # Truncated
+    assert load(data[:HEADER.size - 1]) is None
+    assert load(b"XXXX" + data[4:]) is None  # Bad magic
+
+    # Escape markers changed without the escape count in the header: one
+    # fewer, and one more (a 5.25 px step turned into a marker)
+    marker = data.index(b"\x80", HEADER.size)
+    assert load(data[:marker] + b"\x01" + data[marker + 1:]) is None
+    delta = data.index(bytes([21]), HEADER.size)
+    assert load(data[:delta] + b"\x80" + data[delta + 1:]) is None
+
+def test_save_over_the_ghost_being_played(tmp_path):
+    path = str(tmp_path / "ghost.dat")
+    recorded().save(path, seed=1)
+    ghost = load_ghost(path)
+    ghost.advance()
+
+    ghost.close()
+    assert ghost.advance() is None
+    longer = recorded(PATH + PATH)
+    longer.save(path, seed=2)
+
+    ghost = load_ghost(path)
+    assert (ghost.seed, len(ghost)) == (2, 2 * len(PATH))
+    assert not os.path.exists(path + ".tmp")
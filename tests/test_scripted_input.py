@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from scripted_input import ScriptedInput
+
+def test_script_without_loop_releases_keys_after_the_end():
+    script = ScriptedInput([(2, [pygame.K_RIGHT]), (1, [pygame.K_UP])], loop=False)
+    held = [script() for _ in range(3)]
+    assert [keys[pygame.K_RIGHT] for keys in held] == [True, True, False]
+    assert held[2][pygame.K_UP]
+
+    # Well past the end, every call keeps returning released keys
+    for _ in range(5):
+        keys = script()
+        assert not keys[pygame.K_RIGHT] and not keys[pygame.K_UP]
+
+def test_looping_script_starts_over():
+    script = ScriptedInput([(1, [pygame.K_RIGHT]), (1, [pygame.K_UP])])
+    held = [script() for _ in range(5)]
+    assert [keys[pygame.K_RIGHT] for keys in held] == [True, False, True, False, True]
@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spawn_schedule import SpawnRule, SpawnScheduler, WeightedTable
+
+# What the frame counters the scheduler replaced did: each rule's counter
+# goes up every step and fires when it reaches the interval, hazards
+# first, then pathway coins, then powerups
+def counter_firings(intervals, steps):
+    counters = [0] * len(intervals)
+    firings = []
+    for tick in range(1, steps + 1):
+        for i, interval in enumerate(intervals):
+            counters[i] += 1
+            if counters[i] >= interval:
+                counters[i] = 0
+                firings.append((tick, i))
+    return firings
+
+def test_rules_fire_like_the_frame_counters():
+    intervals = (120, 240, 300)
+    scheduler = SpawnScheduler()
+    firings = []
+    for i, interval in enumerate(intervals):
+        scheduler.add_rule(SpawnRule(interval, lambda i=i: firings.append((scheduler.tick, i))))
+    for _ in range(1200):
+        scheduler.advance()
+    assert firings == counter_firings(intervals, 1200)
+    assert firings[-3:] == [(1200, 0), (1200, 1), (1200, 2)]  # Due together, in the order added
+
+def test_waves_run_before_rules_due_at_the_same_tick():
+    scheduler = SpawnScheduler()
+    firings = []
+    scheduler.add_rule(SpawnRule(10, lambda: firings.append("rule")))
+    scheduler.add_wave([(10, "first"), (10, "second"), (5, "early")], firings.append)
+    for _ in range(10):
+        scheduler.advance()
+    assert firings == ["early", "first", "second", "rule"]
+
+def test_disabled_rule_keeps_its_place():
+    scheduler = SpawnScheduler()
+    firings = []
+    rule = scheduler.add_rule(SpawnRule(3, lambda: firings.append(scheduler.tick)))
+    for tick in range(1, 13):
+        rule.enabled = not 4 <= tick <= 8
+        scheduler.advance()
+    assert firings == [3, 9, 12]
+
+def test_rule_picks_from_its_table():
+    scheduler = SpawnScheduler()
+    kinds = []
+    scheduler.add_rule(SpawnRule(1, kinds.append, table=WeightedTable({"meteor": 1, "laser": 0})))
+    for _ in range(5):
+        scheduler.advance()
+    assert kinds == ["meteor"] * 5
@@ -0,0 +1,36 @@
+# Fixed-timestep game loop helper.
+# Real time is collected in an accumulator and spent in steps of exactly
+# step_ms, so the simulation advances at the same rate however fast or slow
+# frames are drawn. The time left over is a fraction of a step (alpha),
+# which the renderer uses to draw positions between the last two steps.
+
+class FixedTimestep:
+    def __init__(self, step_ms, max_steps=5):
+        self.step_ms = step_ms
+        # Most steps run for one frame; beyond that the game slows down
+        # instead of spending ever longer catching up
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0  # Total simulation steps run
+        self.dropped_ms = 0.0  # Real time skipped because of the catch-up cap
+
+    # Add the real time that passed since the last frame and return how
+    # many simulation steps to run now
+    def advance(self, elapsed_ms):
+        self.accumulator += elapsed_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            # Too far behind (a very slow frame, or the window was dragged):
+            # forget the backlog but keep the fraction of a step
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+            self.accumulator %= self.step_ms
+        else:
+            self.accumulator -= steps * self.step_ms
+        self.steps += steps
+        return steps
+
+    # How far between the last two steps the current frame falls (0 to 1)
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step_ms, 1.0)